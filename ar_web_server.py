@@ -1,16 +1,77 @@
 import asyncio
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance, ImageFilter
+from PIL import Image
 import io
-import numpy as np
 import pytesseract
 import pyttsx3  
-from frame_msg.frame_msg import FrameMsg, RxPhoto, TxCaptureSettings, TxSprite, TxImageSpriteBlock
+from frame_msg import RxPhoto, TxCaptureSettings, TxPlainText
 from aiohttp import web
 import json
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from functools import partial
+from capture_quality import score_capture
+from capture_pipeline import CapturePipeline
+from capture_tuning import CaptureTuner, measure_text
+from ocr import extract_text_and_data, preprocess_for_ocr
+from capture_roi import (PREVIEW_RESOLUTION, PREVIEW_QUALITY_INDEX, crop_to_region, locate_text,
+                         pan_for_region, shift_region)
+from text_layout import wrap_text_to_lines
+from font_index import build_font_index, find_font_file, load_font
+from text_render import render_page
+from page_cache import PageCache, page_cache_key
+from packed_sprite import TxPackedSprite, TxPackedImageSpriteBlock
+from text_scroll import scroll_text
+from strip_display import StripDisplay
+from region_display import DISPLAY_WIDTH, DISPLAY_HEIGHT, pack_region_messages
+from render_pipeline import rendered_messages, rendered_pages
+from display_planner import layout_plain_pages, layout_sprite_pages, plan_display
+from line_sprites import LineSpriteDisplay
+from flow_control import MessageWindow
+from tap_reader import READER_IDLE_TIMEOUT, TapReader
+from ble_trace import TracedFrame, TransportStats
+from ble_batch import BatchingSender
+from frame_link import FrameDevices
 
-pytesseract.pytesseract.tesseract_cmd = '/opt/homebrew/bin/tesseract'
+# Homebrew's tesseract may not be on the PATH the server is started with
+HOMEBREW_TESSERACT = '/opt/homebrew/bin/tesseract'
+if os.path.exists(HOMEBREW_TESSERACT):
+    pytesseract.pytesseract.tesseract_cmd = HOMEBREW_TESSERACT
 
-frame_connection = None
+# Pages rendered and packed ahead of the one being read. A single render
+# thread keeps the shared font objects off concurrent threads, so layout and
+# rendering with them both run there, through on_render_thread() or the executor.
+LOOKAHEAD_PAGES = 2
+# Messages queued between the render thread and the BLE sender, about two 256x256 pages
+PIPELINE_MESSAGES = 18
+render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='render')
+# OCR runs off the event loop so photos keep arriving meanwhile, on threads shared by all the glasses
+OCR_WORKERS = min(4, os.cpu_count() or 1)
+capture_executor = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix='capture')
+# speech blocks until it has finished, one engine at a time
+speech_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speech')
+
+PAGE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'frame-ar-dyslexia', 'pages')
+page_cache = PageCache(PAGE_CACHE_DIR)
+
+# a connection to each Frame kept up between requests, reconnecting by cached address instead of scanning,
+# for the glasses listed in FRAME_DEVICES (e.g. "4F,A2") or else for any one Frame
+DEVICE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'frame-ar-dyslexia')
+FRAME_DEVICES = [device_id.strip().upper() for device_id in os.environ.get('FRAME_DEVICES', '').split(',')
+                 if device_id.strip()]
+frame_devices = FrameDevices(DEVICE_CACHE_DIR, FRAME_DEVICES)
+
+# BLE statistics for every display since the server started, raw traces also go to
+# FRAME_BLE_TRACE as JSON lines when it is set
+transport_stats = TransportStats(trace_path=os.environ.get('FRAME_BLE_TRACE'))
+
+# tap reading sessions still going, by device, each holding its device's link until it is stopped
+# or Frame goes idle
+reading_sessions = {}
+
+# capture resolution and quality follow the text size and OCR confidence of each device's recent captures
+capture_tuners = defaultdict(CaptureTuner)
 
 def read_aloud(text: str):
     if not text.strip():
@@ -19,197 +80,422 @@ def read_aloud(text: str):
     engine.say(text)
     engine.runAndWait()
 
-async def capture_image(num_photos=1, resolution=1080):
-    frame = FrameMsg()
+def preprocess_jpeg_for_ocr(jpeg_bytes, region=None):
+    image = Image.open(io.BytesIO(jpeg_bytes))
+    photo_height = image.height
+    if region is not None:
+        image = crop_to_region(image, region)
+    ocr_image = preprocess_for_ocr(image)
+    # the photo's height in OCR pixels, for measuring text size against the whole photo
+    ocr_image.info['photo_height'] = photo_height * ocr_image.height / image.height
+    return ocr_image
+
+async def preview_capture(pipeline, settings, tuner):
+    """
+    Locate the text in a tiny preview and return the settings and text region for the main capture,
+    and the line height the preview measured
+    """
+    pipeline.capture_msg_bytes = replace(settings, resolution=PREVIEW_RESOLUTION,
+                                         quality_index=PREVIEW_QUALITY_INDEX).pack()
+    located = locate_text(await pipeline.next_photo())
+    if located is None:
+        print("No text found in the preview, capturing the whole view")
+        return settings, None, None
+
+    region, line_height = located
+    pan = pan_for_region(region, settings.pan)
+    resolution = tuner.resolution_for_preview(line_height)
+    print(f"Text in {region[2] - region[0]:.0%} x {region[3] - region[1]:.0%} of the preview, "
+          f"capturing at {resolution} with pan {pan}")
+    return (replace(settings, resolution=resolution, pan=pan), shift_region(region, settings.pan, pan),
+            line_height)
+
+async def upload_frame_app(frame, lib_names, frame_app):
+    """Send a frame app with the std libs it uses and the message queue module every app here requires"""
+    await frame.upload_stdlua_libs(lib_names=lib_names)
+    await frame.upload_file("lua/message_queue.lua", "message_queue.lua")
+    await frame.upload_frame_app(local_filename=frame_app)
+
+async def capture_photos(frame, tuner, num_photos, resolution, quality_index, max_retries, roi):
+    await frame.print_short_text('Capturing...')
+    await upload_frame_app(frame, ['data', 'camera', 'image_sprite_block'], "lua/camera_image_sprite_block_frame_app.lua")
+    await frame.start_frame_app()
+
+    rx_photo = RxPhoto()
+    photo_queue = await rx_photo.attach(frame)
     try:
-        await frame.connect()
-        await frame.print_short_text('Capturing...')
-        await frame.upload_stdlua_libs(lib_names=['data', 'camera', 'image_sprite_block'])
-        await frame.upload_frame_app(local_filename="lua/camera_image_sprite_block_frame_app.lua")
-        await frame.start_frame_app()
-
-        rx_photo = RxPhoto()
-        photo_queue = await rx_photo.attach(frame)
-        capture_msg_bytes = TxCaptureSettings(resolution=resolution, quality_index=0, pan=-40).pack()
-
-        images_for_ocr = []
-
-        for _ in range(num_photos):
-            await frame.send_message(0x0d, capture_msg_bytes)
-            jpeg_bytes = await asyncio.wait_for(photo_queue.get(), timeout=10.0)
-            image = Image.open(io.BytesIO(jpeg_bytes))
-            
-            ocr_image = image.convert('L')
-            ocr_image = ocr_image.resize((3200, 3200), Image.LANCZOS)
-            ocr_image = ocr_image.filter(ImageFilter.MedianFilter(size=3))
-            
-            np_img = np.array(ocr_image)
-            mean_brightness = np_img.mean()
-            
-            if mean_brightness < 100:
-                contrast_factor = 2.5
-                brightness_factor = 1.3
-            elif mean_brightness > 180:
-                contrast_factor = 1.8
-                brightness_factor = 0.9
+        settings = TxCaptureSettings(resolution=resolution, quality_index=quality_index, pan=-40)
+        pipeline = CapturePipeline(frame, photo_queue, settings.pack())
+        loop = asyncio.get_running_loop()
+
+        region = preview_line_height = None
+        if roi:
+            settings, region, preview_line_height = await preview_capture(pipeline, settings, tuner)
+            pipeline.capture_msg_bytes = settings.pack()
+
+        preprocessing = []
+
+        for photo_num in range(num_photos):
+            for attempt in range(max_retries + 1):
+                # not requested ahead, the recapture is only wanted if this photo is rejected
+                jpeg_bytes = await pipeline.next_photo()
+                quality = score_capture(jpeg_bytes)
+                print(f"Capture quality {quality['score']:.2f} (sharpness {quality['sharpness']:.0f}, "
+                      f"clipped {quality['clipped']:.1%}, edges {quality['edge_density']:.1%})")
+                if quality['usable']:
+                    break
+                print(f"Capture rejected (attempt {attempt + 1}/{max_retries + 1})")
             else:
-                contrast_factor = 2.0
-                brightness_factor = 1.1
-            
-            ocr_image = ImageEnhance.Contrast(ocr_image).enhance(contrast_factor)
-            ocr_image = ImageEnhance.Brightness(ocr_image).enhance(brightness_factor)
-            ocr_image = ImageEnhance.Sharpness(ocr_image).enhance(1.8)
-            ocr_image = ocr_image.filter(ImageFilter.UnsharpMask(radius=2, percent=150, threshold=3))
-            
-            images_for_ocr.append(ocr_image)
+                continue
 
+            # Frame takes and sends the next photo while this one is preprocessed
+            if photo_num + 1 < num_photos:
+                await pipeline.request()
+            preprocessing.append(loop.run_in_executor(capture_executor, preprocess_jpeg_for_ocr, jpeg_bytes, region))
+
+        images_for_ocr = list(await asyncio.gather(*preprocessing))
+        return images_for_ocr, settings, preview_line_height
+    finally:
         rx_photo.detach(frame)
-        return images_for_ocr
+        await frame.stop_frame_app()
 
+async def capture_image(link, tuner, num_photos=1, resolution=720, quality_index=0, max_retries=2, roi=False):
+    """
+    The preprocessed images, the settings of the main capture and the line height its preview
+    measured (None without one), or None if capturing failed
+    """
+    try:
+        async with link.session() as frame:
+            return await capture_photos(frame, tuner, num_photos, resolution, quality_index, max_retries, roi)
     except Exception as e:
         print(f"Capture error: {e}")
         return None
-    finally:
-        await frame.stop_frame_app()
-        await frame.disconnect()
 
-def extract_text(image):
-    psm_modes = [
-        ('--oem 3 --psm 3', 'Automatic page segmentation'),
-        ('--oem 3 --psm 6', 'Uniform text block'),
-        ('--oem 1 --psm 3', 'LSTM with auto segmentation'),
-        ('--oem 3 --psm 4', 'Single column of text'),
-    ]
+async def on_render_thread(func, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(render_executor, partial(func, *args, **kwargs))
+
+def hex_to_rgb(color):
+    return tuple(int(color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
+
+def pack_strip(line_sprite, compress):
+    raw = line_sprite.pack()
+    if not compress:
+        return raw
+    # text strips usually shrink a lot under LZ4, but mostly-ink strips can grow, so keep whichever is smaller
+    compressed = replace(line_sprite, compress=True).pack()
+    return compressed if len(compressed) < len(raw) else raw
+
+def pack_page_messages(page_lines, font, line_height, palette_data, compress=False):
+    sprite = TxPackedSprite(
+        width=256,
+        height=256,
+        num_colors=2,
+        palette_data=palette_data,
+        pixel_data=render_page(page_lines, font, line_height)
+    )
+    isb = TxPackedImageSpriteBlock(sprite, sprite_line_height=32)
+    return [isb.pack()] + [pack_strip(line_sprite, compress) for line_sprite in isb.sprite_lines]
+
+def text_line_height(font, line_spacing):
+    return font.getbbox("Test")[3] + line_spacing
+
+def layout_pages(text, font, line_spacing, max_width=240, screen_height=256):
+    all_lines = wrap_text_to_lines(text, font, max_width=max_width)
     
-    results = []
+    print(f"Total lines: {len(all_lines)}")
     
-    for config, description in psm_modes:
-        try:
-            text = pytesseract.image_to_string(image, config=config).strip()
-            if text:
-                results.append((len(text), text, description))
-                print(f"  {description}: {len(text)} chars")
-        except Exception as e:
-            print(f"  {description} failed: {e}")
-            continue
+    line_height = text_line_height(font, line_spacing)
+    max_lines_per_screen = max(1, screen_height // line_height)
     
-    if not results:
-        print("No text detected with any method")
-        return ""
+    print(f"Lines per screen: {max_lines_per_screen}")
     
-    results.sort(reverse=True, key=lambda x: x[0])
-    best_length, best_text, best_method = results[0]
+    pages = []
+    for i in range(0, len(all_lines), max_lines_per_screen):
+        pages.append(all_lines[i:i + max_lines_per_screen])
+    return line_height, pages
+
+async def send_page(frame, messages):
+    isb_header, *sprite_lines = messages
+    await frame.send_message(0x20, isb_header)
+    for line_sprite in sprite_lines:
+        await frame.send_message(0x20, line_sprite)
+
+async def display_text_with_settings(frame, text, settings, compress=False):
+    if not text.strip():
+        print("No text to display")
+        return
+
+    font_name = settings.get('font', 'Comic Sans MS Bold.ttf')
+    font_size = settings.get('fontSize', 64)
+    line_spacing = settings.get('lineSpacing', 2)
+    scroll_speed = settings.get('scrollSpeed', 2.0)
+    text_color = settings.get('textColor', '#ffffff')
+    bg_color = settings.get('bgColor', '#000000')
     
-    print(f"✓ Best result: {best_method} with {best_length} characters")
+    text_rgb = hex_to_rgb(text_color)
+    bg_rgb = hex_to_rgb(bg_color)
     
-    best_text = best_text.replace('|', 'I')
-    best_text = best_text.replace('`', "'")
+    cache_key = page_cache_key('isb 256x256/32', compress, text, find_font_file(font_name) or font_name,
+                               font_size, line_spacing, text_rgb, bg_rgb)
+    cached_pages = await page_cache.get(cache_key)
+    if cached_pages is not None:
+        print(f"Page cache hit, {len(cached_pages)} pages")
+        for page_num, messages in enumerate(cached_pages):
+            print(f"Displaying page {page_num + 1}/{len(cached_pages)}")
+            await send_page(frame, messages)
+            if page_num < len(cached_pages) - 1:
+                await asyncio.sleep(scroll_speed)
+        return
     
-    lines = best_text.split('\n')
-    cleaned_lines = []
-    for line in lines:
-        cleaned = ' '.join(line.split())
-        if cleaned:
-            cleaned_lines.append(cleaned)
+    font = load_font(font_name, font_size)
+    line_height, pages = await on_render_thread(layout_pages, text, font, line_spacing)
     
-    return '\n'.join(cleaned_lines)
-
-def wrap_text_to_lines(text, font, max_width=240):
-    lines = []
-    paragraphs = text.split('\n')
+    print(f"Total pages: {len(pages)}")
+    if not pages:
+        return
+    
+    palette_data = bytes(bg_rgb + text_rgb)
+    packed_pages = []
+    messages = []
     
-    for paragraph in paragraphs:
-        if not paragraph.strip():
-            lines.append('')
+    async for page_num, message in rendered_messages(pages, pack_page_messages, font, line_height, palette_data, compress,
+                                                     executor=render_executor, max_queued=PIPELINE_MESSAGES):
+        if message is not None:
+            await frame.send_message(0x20, message)
+            messages.append(message)
             continue
-            
-        words = paragraph.split()
-        line = ""
-        for word in words:
-            test_line = line + (" " if line else "") + word
-            w = font.getbbox(test_line)[2]
-            if w > max_width:
-                if line:
-                    lines.append(line)
-                line = word
-            else:
-                line = test_line
-        if line:
-            lines.append(line)
+        
+        print(f"Displayed page {page_num + 1}/{len(pages)}, {sum(len(m) for m in messages)} bytes")
+        packed_pages.append(messages)
+        messages = []
+        
+        if page_num < len(pages) - 1:
+            await asyncio.sleep(scroll_speed)
     
-    return lines
+    page_cache.put(cache_key, packed_pages)
 
-async def display_text_with_settings(frame, text, settings):
+async def diff_display_text_with_settings(frame, text, settings):
     if not text.strip():
         print("No text to display")
         return
 
-    font_name = settings.get('font', 'Comic Sans MS Bold.ttf')
-    font_size = settings.get('fontSize', 64)
-    line_spacing = settings.get('lineSpacing', 2)
+    font = load_font(settings.get('font', 'Comic Sans MS Bold.ttf'), settings.get('fontSize', 64))
     scroll_speed = settings.get('scrollSpeed', 2.0)
-    text_color = settings.get('textColor', '#ffffff')
-    bg_color = settings.get('bgColor', '#000000')
+    text_rgb = hex_to_rgb(settings.get('textColor', '#ffffff'))
+    bg_rgb = hex_to_rgb(settings.get('bgColor', '#000000'))
     
-    text_rgb = tuple(int(text_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
-    bg_rgb = tuple(int(bg_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
+    line_height, pages = await on_render_thread(layout_pages, text, font, settings.get('lineSpacing', 2))
     
-    try:
-        font = ImageFont.truetype(font_name, font_size)
-    except:
-        print(f"Font {font_name} not found, using default")
-        font = ImageFont.load_default()
+    print(f"Total pages: {len(pages)}")
+    
+    palette_data = bytes(bg_rgb + text_rgb)
+    strip_display = StripDisplay(frame)
+    
+    async for page_num, page_bits in rendered_pages(pages, render_page, font, line_height,
+                                                    executor=render_executor, max_queued=LOOKAHEAD_PAGES):
+        sent = await strip_display.show_page(page_bits, palette_data)
+        print(f"Displayed page {page_num + 1}/{len(pages)}, {sent} bytes sent")
+        
+        if page_num < len(pages) - 1:
+            await asyncio.sleep(scroll_speed)
 
-    all_lines = wrap_text_to_lines(text, font, max_width=240)
+async def scroll_text_with_settings(frame, text, settings):
+    if not text.strip():
+        print("No text to display")
+        return
+
+    font = load_font(settings.get('font', 'Comic Sans MS Bold.ttf'), settings.get('fontSize', 64))
+    line_spacing = settings.get('lineSpacing', 2)
+    scroll_speed = settings.get('scrollSpeed', 2.0)
+    text_rgb = hex_to_rgb(settings.get('textColor', '#ffffff'))
+    bg_rgb = hex_to_rgb(settings.get('bgColor', '#000000'))
+    
+    all_lines = await on_render_thread(wrap_text_to_lines, text, font, max_width=240)
     
     print(f"Total lines: {len(all_lines)}")
     if not all_lines:
         return
     
-    line_height = font.getbbox("Test")[3] + line_spacing
-    max_lines_per_screen = max(1, 256 // line_height)
+    line_height = await on_render_thread(text_line_height, font, line_spacing)
+    palette_data = bytes(bg_rgb + text_rgb)
     
-    print(f"Lines per screen: {max_lines_per_screen}")
+    await scroll_text(frame, all_lines, font, line_height, palette_data, scroll_speed, render_executor)
+
+async def full_display_text_with_settings(frame, text, settings):
+    if not text.strip():
+        print("No text to display")
+        return
+
+    font = load_font(settings.get('font', 'Comic Sans MS Bold.ttf'), settings.get('fontSize', 64))
+    scroll_speed = settings.get('scrollSpeed', 2.0)
+    text_rgb = hex_to_rgb(settings.get('textColor', '#ffffff'))
+    bg_rgb = hex_to_rgb(settings.get('bgColor', '#000000'))
     
-    pages = []
-    for i in range(0, len(all_lines), max_lines_per_screen):
-        pages.append(all_lines[i:i + max_lines_per_screen])
+    line_height, pages = await on_render_thread(layout_pages, text, font, settings.get('lineSpacing', 2),
+                                                max_width=DISPLAY_WIDTH - 16, screen_height=DISPLAY_HEIGHT)
     
     print(f"Total pages: {len(pages)}")
     
-    for page_num, page_lines in enumerate(pages):
-        print(f"Displaying page {page_num + 1}/{len(pages)}")
-        
-        img = Image.new('RGB', (256, 256), color=bg_rgb)
-        draw = ImageDraw.Draw(img)
+    palette_data = bytes(bg_rgb + text_rgb)
+    
+    async for page_num, message in rendered_messages(pages, pack_region_messages, font, line_height, palette_data,
+                                                     executor=render_executor, max_queued=PIPELINE_MESSAGES):
+        if message is not None:
+            await frame.send_message(*message)
+            continue
         
-        y = 0
-        for line in page_lines:
-            if y + line_height <= 256:
-                draw.text((4, y), line, font=font, fill=text_rgb)
-                y += line_height
+        print(f"Displayed page {page_num + 1}/{len(pages)}")
         
-        img_gray = img.convert('L')
-        bw = img_gray.point(lambda x: 0 if x < 128 else 255, '1')
-        unpacked = np.unpackbits(np.frombuffer(bw.tobytes(), dtype=np.uint8))
+        if page_num < len(pages) - 1:
+            await asyncio.sleep(scroll_speed)
+
+async def plain_display_text_with_settings(frame, text, settings):
+    if not text.strip():
+        print("No text to display")
+        return
+
+    scroll_speed = settings.get('scrollSpeed', 2.0)
+    pages = layout_plain_pages(text)
+    
+    print(f"Total pages: {len(pages)}")
+    
+    for page_num, page_lines in enumerate(pages):
+        print(f"Displaying page {page_num + 1}/{len(pages)}")
+        await frame.send_message(0x0a, TxPlainText('\n'.join(page_lines)).pack())
         
-        sprite = TxSprite(
-            width=256,
-            height=256,
-            num_colors=2,
-            palette_data=bytes([bg_rgb[0], bg_rgb[1], bg_rgb[2], text_rgb[0], text_rgb[1], text_rgb[2]]),
-            pixel_data=unpacked.tobytes()
-        )
-        isb = TxImageSpriteBlock(sprite, sprite_line_height=32)
-
-        await frame.send_message(0x20, isb.pack())
-        for line_sprite in isb.sprite_lines:
-            await frame.send_message(0x20, line_sprite.pack())
-            await asyncio.sleep(0.02)
+        if page_num < len(pages) - 1:
+            await asyncio.sleep(scroll_speed)
+
+async def sprite_block_display_text_with_settings(frame, text, settings):
+    if not text.strip():
+        print("No text to display")
+        return
+
+    font = load_font(settings.get('font', 'Comic Sans MS Bold.ttf'), settings.get('fontSize', 64))
+    scroll_speed = settings.get('scrollSpeed', 2.0)
+    text_rgb = hex_to_rgb(settings.get('textColor', '#ffffff'))
+    bg_rgb = hex_to_rgb(settings.get('bgColor', '#000000'))
+    
+    line_height = await on_render_thread(text_line_height, font, settings.get('lineSpacing', 2))
+    pages = await on_render_thread(layout_sprite_pages, text, font, line_height)
+    
+    print(f"Total pages: {len(pages)}")
+    
+    palette_data = bytes(bg_rgb + text_rgb)
+    line_display = LineSpriteDisplay(frame, render_executor)
+    
+    for page_num, page_lines in enumerate(pages):
+        sent = await line_display.show_lines(page_lines, font, line_height, palette_data)
+        print(f"Displayed page {page_num + 1}/{len(pages)}, {sent} bytes sent")
         
         if page_num < len(pages) - 1:
             await asyncio.sleep(scroll_speed)
 
+async def tap_read_text_with_settings(frame, text, settings):
+    if not text.strip():
+        print("No text to display")
+        return
+
+    font = load_font(settings.get('font', 'Comic Sans MS Bold.ttf'), settings.get('fontSize', 64))
+    text_rgb = hex_to_rgb(settings.get('textColor', '#ffffff'))
+    bg_rgb = hex_to_rgb(settings.get('bgColor', '#000000'))
+    
+    line_height = await on_render_thread(text_line_height, font, settings.get('lineSpacing', 2))
+    pages = await on_render_thread(layout_sprite_pages, text, font, line_height)
+    
+    print(f"Total pages: {len(pages)}")
+    if not pages:
+        return
+    
+    reader = TapReader(frame, pages, font, line_height, bytes(bg_rgb + text_rgb), render_executor)
+    await reader.read(settings.get('readTimeout', READER_IDLE_TIMEOUT))
+
+def choose_display_route(text, settings):
+    """Pick the cheapest display route that honours the font and colours in settings"""
+    font = load_font(settings.get('font', 'Comic Sans MS Bold.ttf'), settings.get('fontSize', 64))
+    text_rgb = hex_to_rgb(settings.get('textColor', '#ffffff'))
+    bg_rgb = hex_to_rgb(settings.get('bgColor', '#000000'))
+    line_height, pages = layout_pages(text, font, settings.get('lineSpacing', 2))
+    
+    route, estimates = plan_display(text, font, line_height, len(pages), settings, text_rgb, bg_rgb)
+    for name, estimate in estimates.items():
+        print(f"Route {name}: {estimate['bytes']} bytes in {estimate['messages']} messages, ~{estimate['seconds']:.2f}s")
+    print(f"Display route: {route}")
+    return route
+
+DISPLAY_MODES = {
+    'page': (['data', 'image_sprite_block'], "lua/camera_image_sprite_block_frame_app.lua", display_text_with_settings),
+    'scroll': (['data', 'sprite'], "lua/text_scroll_frame_app.lua", scroll_text_with_settings),
+    'diff': (['data', 'sprite', 'code'], "lua/strip_update_frame_app.lua", diff_display_text_with_settings),
+    'lz4': (['data', 'image_sprite_block'], "lua/compressed_prog_sprite_frame_app.lua",
+            partial(display_text_with_settings, compress=True)),
+    'full': (['data', 'sprite', 'code'], "lua/region_frame_app.lua", full_display_text_with_settings),
+    'plain': (['data', 'plain_text'], "lua/plain_text_frame_app.lua", plain_display_text_with_settings),
+    'sprites': (['data', 'sprite'], "lua/text_sprite_block_frame_app.lua", sprite_block_display_text_with_settings),
+    'tap': (['data', 'sprite'], "lua/tap_reader_frame_app.lua", tap_read_text_with_settings),
+}
+
+def request_device_id(request):
+    """The device ID of a /devices/{device_id}/ request, or None for whichever Frame is found"""
+    device_id = request.match_info.get('device_id')
+    return device_id.upper() if device_id else None
+
+async def show_on_frame(frame, mode, text, data, started=None):
+    """Run a display mode on a connected Frame, setting the started future once its frame app runs"""
+    lib_names, frame_app, display = DISPLAY_MODES[mode]
+    await upload_frame_app(frame, lib_names, frame_app)
+    await frame.start_frame_app()
+    if started is not None:
+        started.set_result(None)
+    
+    # every display frame app acks what it has processed, so the window paces the sending,
+    # and splits up batches of the small messages the window lets through together
+    window = MessageWindow(BatchingSender(TracedFrame(frame, transport_stats)))
+    try:
+        await display(window, text, data)
+        await window.drain()
+    finally:
+        window.close()
+    print(transport_stats.format_summary())
+    
+    if data.get('readAloud', False):
+        await asyncio.get_running_loop().run_in_executor(speech_executor, read_aloud, text)
+    
+    await frame.stop_frame_app()
+
+async def read_in_background(link, text, data, started):
+    try:
+        async with link.session() as frame:
+            await show_on_frame(frame, 'tap', text, data, started)
+    except Exception as e:
+        print(f"Tap reading error: {e}")
+        if not started.done():
+            started.set_exception(e)
+    finally:
+        if not started.done():
+            started.set_exception(RuntimeError('Reading stopped before it started'))
+
+async def start_reading(device_id, link, text, data):
+    """Start a tap reading session that keeps the device's link until it goes idle or is stopped"""
+    started = asyncio.get_running_loop().create_future()
+    task = asyncio.ensure_future(read_in_background(link, text, data, started))
+    reading_sessions[device_id] = task
+
+    def forget(task):
+        if reading_sessions.get(device_id) is task:
+            del reading_sessions[device_id]
+    task.add_done_callback(forget)
+    await started
+
+async def stop_reading(device_id):
+    """End the device's tap reading session, returns whether there was one"""
+    task = reading_sessions.pop(device_id, None)
+    if task is None or task.done():
+        return False
+    task.cancel()
+    await asyncio.wait([task])
+    return True
+
 async def handle_display(request):
     try:
         data = await request.json()
@@ -217,45 +503,101 @@ async def handle_display(request):
         
         if not text:
             return web.json_response({'error': 'No text provided'}, status=400)
+        scroll_speed = data.get('scrollSpeed', 2.0)
+        if isinstance(scroll_speed, bool) or not isinstance(scroll_speed, (int, float)) or scroll_speed <= 0:
+            return web.json_response({'error': 'scrollSpeed must be a number of seconds above 0'}, status=400)
         
-        frame = FrameMsg()
-        await frame.connect()
-        await frame.upload_stdlua_libs(lib_names=['data', 'image_sprite_block'])
-        await frame.upload_frame_app(local_filename="lua/camera_image_sprite_block_frame_app.lua")
-        await frame.start_frame_app()
-        
-        await display_text_with_settings(frame, text, data)
+        mode = data.get('mode', 'auto')
+        if mode == 'auto':
+            mode = await on_render_thread(choose_display_route, text, data)
+        if mode not in DISPLAY_MODES:
+            return web.json_response({'error': f'Unknown display mode: {mode}'}, status=400)
+        device_id = request_device_id(request)
+        try:
+            link = frame_devices.link(device_id)
+        except KeyError as e:
+            return web.json_response({'error': e.args[0]}, status=404)
         
-        if data.get('readAloud', False):
-            read_aloud(text)
+        # whatever is shown next replaces a reading session still going on the device
+        await stop_reading(device_id)
+        if mode == 'tap':
+            # the request returns once reading has started, page turns are served in the background
+            await start_reading(device_id, link, text, data)
+            return web.json_response({'status': 'reading', 'route': mode})
         
-        await frame.stop_frame_app()
-        await frame.disconnect()
+        async with link.session() as frame:
+            await show_on_frame(frame, mode, text, data)
         
-        return web.json_response({'status': 'success'})
+        return web.json_response({'status': 'success', 'route': mode})
         
     except Exception as e:
         print(f"Display error: {e}")
         return web.json_response({'error': str(e)}, status=500)
 
+async def handle_stop(request):
+    device_id = request_device_id(request)
+    try:
+        frame_devices.link(device_id)
+    except KeyError as e:
+        return web.json_response({'error': e.args[0]}, status=404)
+    return web.json_response({'status': 'stopped' if await stop_reading(device_id) else 'idle'})
+
 async def handle_capture(request):
     try:
-        images = await capture_image(num_photos=1)
+        params = await request.json() if request.can_read_body else {}
+        device_id = request_device_id(request)
+        try:
+            link = frame_devices.link(device_id)
+        except KeyError as e:
+            return web.json_response({'error': e.args[0]}, status=404)
+        await stop_reading(device_id)
+        tuner = capture_tuners[device_id]
+        settings = tuner.capture_settings()
+        captured = await capture_image(link, tuner, num_photos=1,
+                                       resolution=settings.resolution, quality_index=settings.quality_index,
+                                       roi=params.get('mode', 'roi') == 'roi')
         
-        if not images:
+        if captured is None:
             return web.json_response({'error': 'Failed to capture image'}, status=500)
+        images, settings, preview_line_height = captured
+        if not images:
+            return web.json_response({'error': 'Image too blurry or overexposed, please try again'}, status=422)
         
-        text = extract_text(images[0])
+        text, data = await asyncio.get_running_loop().run_in_executor(capture_executor, extract_text_and_data,
+                                                                      images[0])
+        # the tuner measures the text from the word data of the same OCR pass
+        photo_height = images[0].info.get('photo_height', images[0].height)
+        tuner.observe(settings.resolution, settings.quality_index, measure_text(data, photo_height),
+                      preview_line_height)
         
         return web.json_response({
             'text': text,
-            'length': len(text)
+            'length': len(text),
+            'resolution': settings.resolution,
+            'quality_index': settings.quality_index,
+            'pan': settings.pan
         })
         
     except Exception as e:
         print(f"Capture error: {e}")
         return web.json_response({'error': str(e)}, status=500)
 
+async def handle_devices(request):
+    return web.json_response(frame_devices.status())
+
+async def handle_transport(request):
+    try:
+        num_traces = max(1, int(request.query.get('traces', 100)))
+    except ValueError:
+        return web.json_response({'error': 'traces must be a whole number'}, status=400)
+    return web.json_response({
+        'summary': transport_stats.summary(),
+        'traces': list(transport_stats.traces)[-num_traces:],
+    })
+
+async def close_transport_stats(app):
+    transport_stats.close()
+
 async def handle_index(request):
     try:
         with open('ar_control.html', 'r') as f:
@@ -281,6 +623,17 @@ async def main():
     app.router.add_get('/', handle_index)
     app.router.add_post('/display', handle_display)
     app.router.add_post('/capture', handle_capture)
+    app.router.add_post('/stop', handle_stop)
+    app.router.add_get('/transport', handle_transport)
+    # the same for a particular Frame, by the two character ID it shows
+    app.router.add_post('/devices/{device_id:[0-9A-Fa-f]{2}}/display', handle_display)
+    app.router.add_post('/devices/{device_id:[0-9A-Fa-f]{2}}/capture', handle_capture)
+    app.router.add_post('/devices/{device_id:[0-9A-Fa-f]{2}}/stop', handle_stop)
+    app.router.add_get('/devices', handle_devices)
+    app.on_cleanup.append(close_transport_stats)
+    
+    font_index = build_font_index()
+    print(f"🔤 Indexed {len(font_index)} font names")
     
     print("🚀 AR Glasses Web Server starting on http://localhost:8000")
     print("📱 Open your browser and go to http://localhost:8000")
@@ -289,8 +642,14 @@ async def main():
     await runner.setup()
     site = web.TCPSite(runner, 'localhost', 8000)
     await site.start()
+
+    frame_devices.start()
     
-    await asyncio.Event().wait()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await frame_devices.close()
+        await runner.cleanup()
 
 if __name__ == "__main__":
     asyncio.run(main())
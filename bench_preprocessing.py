@@ -0,0 +1,248 @@
+"""
+Benchmark the OCR preprocessing recipes used across the repo over a stored capture corpus.
+
+The corpus is a directory of JPEG captures, each with a ground-truth `<name>.txt` next to it.
+Every recipe runs in its own fresh process so that peak RSS figures are not polluted by the
+recipes that ran before it. Each stage's peak is sampled while it runs, as how far RSS rose above
+where the stage started; that needs /proc or psutil and shows as n/a without either.
+
+    python bench_preprocessing.py captures/ --json bench.json
+"""
+import argparse
+import io
+import json
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from PIL import Image, ImageEnhance, ImageFilter
+import pytesseract
+
+import ocr
+
+def decode_jpeg(jpeg_bytes):
+    image = Image.open(io.BytesIO(jpeg_bytes))
+    image.load()
+    return image
+
+# calisiyo_ar_web_server.py and deneme4.py
+def preprocess_calisiyo(image):
+    ocr_image = image.convert('L')
+    ocr_image = ocr_image.resize((2400, 2400), Image.LANCZOS)
+    ocr_image = ocr_image.filter(ImageFilter.MedianFilter(size=3))
+    ocr_image = ImageEnhance.Contrast(ocr_image).enhance(2.0)
+    ocr_image = ImageEnhance.Sharpness(ocr_image).enhance(1.5)
+    ocr_image = ImageEnhance.Brightness(ocr_image).enhance(1.1)
+    return ocr_image
+
+def extract_text_calisiyo(image):
+    results = []
+    for config in ["--oem 3 --psm 6", "--oem 1 --psm 6", "--oem 3 --psm 3"]:
+        try:
+            text = pytesseract.image_to_string(image, config=config).strip()
+            if text:
+                results.append(text)
+        except Exception:
+            continue
+    if results:
+        return max(results, key=len)
+    return ""
+
+# deneme 3_displaywithscroll.py, deneme2_displayandsound.py and textdetectionworks.py
+def preprocess_deneme(image):
+    ocr_image = image.convert('L')
+    ocr_image = ImageEnhance.Contrast(ocr_image).enhance(3.0)
+    ocr_image = ImageEnhance.Sharpness(ocr_image).enhance(2.0)
+    ocr_image = ocr_image.filter(ImageFilter.MedianFilter())
+    ocr_image = ocr_image.resize((1200, 1200), Image.LANCZOS)
+    return ocr_image
+
+def extract_text_deneme(image):
+    return pytesseract.image_to_string(image, config="--oem 3 --psm 6").strip()
+
+RECIPES = {
+    'ar_web_server': [
+        ('decode', decode_jpeg),
+        ('preprocess', ocr.preprocess_for_ocr),
+        ('ocr', ocr.extract_text),
+    ],
+    'calisiyo': [
+        ('decode', decode_jpeg),
+        ('preprocess', preprocess_calisiyo),
+        ('ocr', extract_text_calisiyo),
+    ],
+    'deneme': [
+        ('decode', decode_jpeg),
+        ('preprocess', preprocess_deneme),
+        ('ocr', extract_text_deneme),
+    ],
+}
+
+def _rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _current_rss_mb():
+    # /proc where there is one, psutil where it is installed, otherwise unknown
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+class StagePeak:
+    """Samples RSS on a thread while a stage runs, for how far the stage took it above its starting point"""
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.start_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, _current_rss_mb())
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = _current_rss_mb()
+        if self.start_mb is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start_mb is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak_mb = max(self.peak_mb, _current_rss_mb())
+
+    def growth_mb(self):
+        return None if self.start_mb is None else self.peak_mb - self.start_mb
+
+def _normalize(text):
+    return ' '.join(text.split())
+
+def character_error_rate(hypothesis, reference):
+    hypothesis = _normalize(hypothesis)
+    reference = _normalize(reference)
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ref_char != hyp_char)))
+        previous = current
+    return previous[-1] / len(reference)
+
+def load_corpus(corpus_dir):
+    corpus = []
+    for jpeg_path in sorted(Path(corpus_dir).iterdir()):
+        if jpeg_path.suffix.lower() not in ('.jpg', '.jpeg'):
+            continue
+        truth_path = jpeg_path.with_suffix('.txt')
+        if not truth_path.exists():
+            print(f"Skipping {jpeg_path.name}: no ground truth {truth_path.name}")
+            continue
+        corpus.append((jpeg_path.name, jpeg_path.read_bytes(), truth_path.read_text()))
+    return corpus
+
+def run_recipe(recipe_name, corpus):
+    """Run one recipe over the whole corpus, meant to be called in a fresh process"""
+    stages = RECIPES[recipe_name]
+    stage_totals = {name: {'wall_s': 0.0, 'peak_rss_mb': None} for name, _ in stages}
+    per_image = []
+
+    start = time.perf_counter()
+    for name, jpeg_bytes, truth in corpus:
+        value = jpeg_bytes
+        image_stages = {}
+        for stage_name, stage in stages:
+            with StagePeak() as peak:
+                stage_start = time.perf_counter()
+                value = stage(value)
+                elapsed = time.perf_counter() - stage_start
+            image_stages[stage_name] = elapsed
+            totals = stage_totals[stage_name]
+            totals['wall_s'] += elapsed
+            if peak.growth_mb() is not None:
+                totals['peak_rss_mb'] = max(totals['peak_rss_mb'] or 0.0, peak.growth_mb())
+        per_image.append({
+            'image': name,
+            'stages_s': image_stages,
+            'cer': character_error_rate(value, truth),
+        })
+    wall_s = time.perf_counter() - start
+
+    return {
+        'images': len(corpus),
+        'wall_s': wall_s,
+        'cer': sum(r['cer'] for r in per_image) / len(per_image) if per_image else 0.0,
+        'peak_rss_mb': _rss_mb(),
+        'ocr_peak_rss_mb': _rss_mb(resource.RUSAGE_CHILDREN),
+        'stages': stage_totals,
+        'per_image': per_image,
+    }
+
+def print_table(results):
+    header = f"{'recipe':<16}{'stage':<12}{'wall s':>10}{'s/image':>10}{'peak RSS MB':>13}{'CER':>8}"
+    print(header)
+    print('-' * len(header))
+    for recipe_name, result in results.items():
+        n = max(1, result['images'])
+        print(f"{recipe_name:<16}{'total':<12}{result['wall_s']:>10.2f}{result['wall_s'] / n:>10.3f}"
+              f"{result['peak_rss_mb']:>13.1f}{result['cer']:>8.3f}")
+        for stage_name, stage in result['stages'].items():
+            peak = 'n/a' if stage['peak_rss_mb'] is None else f"+{stage['peak_rss_mb']:.1f}"
+            print(f"{'':<16}{stage_name:<12}{stage['wall_s']:>10.2f}{stage['wall_s'] / n:>10.3f}"
+                  f"{peak:>13}{'':>8}")
+        print(f"{'':<16}{'tesseract':<12}{'':>10}{'':>10}{result['ocr_peak_rss_mb']:>13.1f}{'':>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR preprocessing recipes over saved captures")
+    parser.add_argument('corpus', help="directory of .jpg captures with matching .txt ground truth")
+    parser.add_argument('--recipes', default=','.join(RECIPES),
+                        help=f"comma separated recipe names (default: {','.join(RECIPES)})")
+    parser.add_argument('--json', help="write the full results as JSON to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    recipe_names = [name.strip() for name in args.recipes.split(',') if name.strip()]
+    unknown = [name for name in recipe_names if name not in RECIPES]
+    if unknown:
+        parser.error(f"unknown recipes: {', '.join(unknown)}")
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error(f"no captures with ground truth found in {args.corpus}")
+    print(f"Corpus: {len(corpus)} captures")
+
+    results = {}
+    for recipe_name in recipe_names:
+        print(f"Running {recipe_name}...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            results[recipe_name] = pool.submit(run_recipe, recipe_name, corpus).result()
+
+    print()
+    print_table(results)
+
+    if args.json == '-':
+        print(json.dumps(results, indent=2))
+    elif args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Coalescing of small messages into fuller BLE writes. Every message starts a new packet, so a run
+of small messages (a palette, a draw code, an offsets table, the tail of a strip) leaves many
+packets part empty. BatchingSender queues messages for up to max_delay and sends them together
+as one BATCH_MSG, [msg code(Uint8), length(Uint16), payload] for each, which the display frame
+apps split again and hand to their parsers one at a time, in order. Once a message code has gone
+in a batch, later messages of that code go in batches too, even alone, so none can overtake it.
+"""
+import asyncio
+import struct
+
+from ble_trace import TracedFrame
+
+BATCH_MSG = 0x40
+BATCH_ENTRY_HEADER_SIZE = 3
+MAX_MESSAGE_SIZE = 0xFFFF
+
+class BatchingSender:
+    """Queues messages and sends them in batches of about max_packets packets"""
+
+    def __init__(self, frame, max_delay=0.01, max_packets=4):
+        self.frame = frame
+        self.max_delay = max_delay
+        self.max_packets = max_packets
+        self.queued = []
+        self.queued_bytes = 0
+        self._flush_timer = None
+        # the flush the timer started, and its error until the next send or flush raises it
+        self._flush_task = None
+        self._flush_error = None
+        self._lock = asyncio.Lock()
+        self.batched_codes = set()
+
+    def _timed_flush(self):
+        self._flush_task = asyncio.ensure_future(self.flush(raise_pending=False))
+        self._flush_task.add_done_callback(self._timed_flush_done)
+
+    def _timed_flush_done(self, task):
+        if not task.cancelled() and task.exception() is not None:
+            self._flush_error = task.exception()
+
+    def _raise_flush_error(self):
+        error, self._flush_error = self._flush_error, None
+        if error is not None:
+            raise error
+
+    async def send_message(self, msg_code, payload):
+        self._raise_flush_error()
+        entry_size = BATCH_ENTRY_HEADER_SIZE + len(payload)
+        if self.queued_bytes + entry_size > MAX_MESSAGE_SIZE:
+            await self.flush()
+
+        self.queued.append((msg_code, payload))
+        self.queued_bytes += entry_size
+
+        if self.queued_bytes >= self.max_packets * self.frame.ble.max_data_payload():
+            await self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(self.max_delay, self._timed_flush)
+
+    async def flush(self, raise_pending=True):
+        if raise_pending:
+            self._raise_flush_error()
+        async with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            queued, self.queued, self.queued_bytes = self.queued, [], 0
+
+            if len(queued) == 1 and (queued[0][0] not in self.batched_codes or
+                                     len(queued[0][1]) + BATCH_ENTRY_HEADER_SIZE > MAX_MESSAGE_SIZE):
+                await self.frame.send_message(*queued[0])
+            elif queued:
+                self.batched_codes.update(msg_code for msg_code, _ in queued)
+                batch = b''.join(struct.pack('>BH', msg_code, len(payload)) + bytes(payload)
+                                 for msg_code, payload in queued)
+                if isinstance(self.frame, TracedFrame):
+                    # traced under the codes of the messages in it rather than all as BATCH_MSG
+                    await self.frame.send_message(BATCH_MSG, batch,
+                                                  entries=[(msg_code, len(payload)) for msg_code, payload in queued])
+                else:
+                    await self.frame.send_message(BATCH_MSG, batch)
+
+    def __getattr__(self, name):
+        # anything other than sending goes straight to the FrameMsg connection
+        return getattr(self.frame, name)
@@ -0,0 +1,157 @@
+"""
+BLE transport instrumentation. TracedFrame wraps a FrameMsg connection and sends each message
+in the same packets FrameBle.send_message would, timing every acknowledged write. TransportStats
+keeps running totals per message code (payload and on-air bytes, packets, how full the packets
+are against the MTU, write latency, effective bytes/s) and a trace of recent messages, optionally
+appended as JSON lines to a file for later analysis. A batch of messages sent as one is counted
+under the codes of the messages in it, each taking a share of the batch's packets by size.
+"""
+import json
+import time
+from collections import defaultdict, deque
+
+# FrameBle.send_message framing: the first packet carries msg_code and a Uint16 length, the rest
+# only msg_code, and send_data prefixes every packet with a 0x01 data flag
+FIRST_HEADER_SIZE = 3
+SUBSEQUENT_HEADER_SIZE = 1
+DATA_FLAG = b'\x01'
+
+MAX_LATENCY_SAMPLES = 2000
+
+class CodeStats:
+    """Running totals for one message code"""
+
+    def __init__(self):
+        self.messages = 0
+        # messages that went inside a batch
+        self.batched = 0
+        self.payload_bytes = 0
+        self.wire_bytes = 0
+        self.packets = 0
+        self.packet_capacity = 0
+        self.send_seconds = 0.0
+        self.write_latencies = deque(maxlen=MAX_LATENCY_SAMPLES)
+
+    def as_dict(self):
+        latencies = sorted(self.write_latencies)
+        return {
+            'messages': self.messages,
+            'batched': self.batched,
+            'payload_bytes': self.payload_bytes,
+            'wire_bytes': round(self.wire_bytes),
+            'packets': round(self.packets, 1),
+            'packets_per_message': self.packets / self.messages if self.messages else 0,
+            'mtu_fill': self.wire_bytes / self.packet_capacity if self.packet_capacity else 0,
+            'bytes_per_second': self.payload_bytes / self.send_seconds if self.send_seconds else 0,
+            'write_ms_mean': 1000 * sum(latencies) / len(latencies) if latencies else 0,
+            'write_ms_p95': 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0,
+            'write_ms_max': 1000 * latencies[-1] if latencies else 0,
+        }
+
+class TransportStats:
+    """Per message code transport statistics and raw traces, shared across connections"""
+
+    def __init__(self, trace_path=None, max_traces=2000):
+        self.codes = defaultdict(CodeStats)
+        self.traces = deque(maxlen=max_traces)
+        self.trace_path = trace_path
+        # opened with the first trace, so nothing is opened until something is sent
+        self._trace_file = None
+
+    def record(self, msg_code, payload_size, packet_sizes, packet_capacity, write_latencies, started, entries=None):
+        """entries lists the (msg_code, payload size) of each message in a batch, for counting them as themselves"""
+        if entries:
+            # the batch's own bytes (entry headers) are shared evenly, the rest goes by payload size
+            overhead = (payload_size - sum(size for _, size in entries)) / len(entries)
+            shares = [(code, size, (size + overhead) / payload_size) for code, size in entries]
+        else:
+            shares = [(msg_code, payload_size, 1.0)]
+
+        for code, size, share in shares:
+            stats = self.codes[code]
+            stats.messages += 1
+            if entries:
+                stats.batched += 1
+            stats.payload_bytes += size
+            stats.wire_bytes += share * sum(packet_sizes)
+            stats.packets += share * len(packet_sizes)
+            stats.packet_capacity += share * len(packet_sizes) * packet_capacity
+            stats.send_seconds += share * sum(write_latencies)
+            stats.write_latencies.extend(write_latencies)
+
+        trace = {
+            'time': started,
+            'msg_code': msg_code,
+            'payload_bytes': payload_size,
+            'packet_bytes': packet_sizes,
+            'packet_capacity': packet_capacity,
+            'write_ms': [round(1000 * latency, 3) for latency in write_latencies],
+        }
+        if entries:
+            trace['entries'] = [list(entry) for entry in entries]
+        self.traces.append(trace)
+        if self.trace_path:
+            if self._trace_file is None:
+                self._trace_file = open(self.trace_path, 'a', buffering=1)
+            self._trace_file.write(json.dumps(trace) + '\n')
+
+    def close(self):
+        if self._trace_file is not None:
+            self._trace_file.close()
+            self._trace_file = None
+
+    def summary(self):
+        return {f"0x{msg_code:02x}": stats.as_dict() for msg_code, stats in sorted(self.codes.items())}
+
+    def format_summary(self):
+        lines = [f"{'code':>6} {'msgs':>6} {'bytes':>9} {'pkts':>6} {'pkt/msg':>7} {'fill':>6} "
+                 f"{'KB/s':>7} {'write ms':>9} {'p95 ms':>7}"]
+        for code, stats in self.summary().items():
+            lines.append(f"{code:>6} {stats['messages']:>6} {stats['payload_bytes']:>9} {stats['packets']:>6.1f} "
+                         f"{stats['packets_per_message']:>7.1f} {stats['mtu_fill']:>6.1%} "
+                         f"{stats['bytes_per_second'] / 1000:>7.2f} {stats['write_ms_mean']:>9.1f} "
+                         f"{stats['write_ms_p95']:>7.1f}")
+        return '\n'.join(lines)
+
+class TracedFrame:
+    """A FrameMsg connection whose send_message records every packet it writes"""
+
+    def __init__(self, frame, stats):
+        self.frame = frame
+        self.stats = stats
+
+    async def send_message(self, msg_code, payload, show_me=False, entries=None):
+        """entries, for a batch, lists the (msg_code, payload size) of each message in it"""
+        if len(payload) > 0xFFFF:
+            raise ValueError(f"Payload size {len(payload)} exceeds maximum 65535 bytes")
+
+        ble = self.frame.ble
+        max_payload = ble.max_data_payload()
+        payload = memoryview(payload)
+        started = time.time()
+
+        packet_sizes = []
+        write_latencies = []
+        chunk_start = 0
+        header = bytes([msg_code, len(payload) >> 8, len(payload) & 0xFF])
+        while True:
+            chunk_end = min(len(payload), chunk_start + max_payload - len(header))
+            packet = header + payload[chunk_start:chunk_end]
+
+            write_start = time.perf_counter()
+            await ble.send_data(packet, show_me=show_me, await_data=True)
+            write_latencies.append(time.perf_counter() - write_start)
+            packet_sizes.append(len(DATA_FLAG) + len(packet))
+
+            chunk_start = chunk_end
+            if chunk_start >= len(payload):
+                break
+            header = bytes([msg_code])
+
+        # a packet can hold max_data_payload() bytes plus the data flag
+        self.stats.record(msg_code, len(payload), packet_sizes, max_payload + len(DATA_FLAG),
+                          write_latencies, started, entries)
+
+    def __getattr__(self, name):
+        # anything other than sending goes straight to the FrameMsg connection
+        return getattr(self.frame, name)
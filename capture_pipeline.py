@@ -0,0 +1,38 @@
+"""
+Pipelined photo capture. Frame takes one photo per capture request, and asking for the next photo
+only once the host has finished with the last leaves Frame idle while the host decodes and
+processes. CapturePipeline lets the caller ask for the next photo as soon as one arrives, so Frame
+captures and sends it while the host works on the photo it already has, and photos come about as
+fast as the link can carry them rather than at transfer plus processing time.
+
+This only helps when the caller knows it wants another photo. The server's /capture takes a single
+photo, so it is unchanged, and a recapture is requested only once a photo has been rejected: asking
+for it ahead would cost a whole extra photo transfer whenever the first photo is usable, the usual case.
+"""
+import asyncio
+
+CAPTURE_SETTINGS_MSG = 0x0d
+
+class CapturePipeline:
+    """Requests photos from a camera frame app, with at most one request outstanding"""
+
+    def __init__(self, frame, photo_queue, capture_msg_bytes, timeout=10.0):
+        self.frame = frame
+        self.photo_queue = photo_queue
+        self.capture_msg_bytes = capture_msg_bytes
+        self.timeout = timeout
+        self.outstanding = False
+
+    async def request(self):
+        """Ask Frame for the next photo now, unless it is already taking one"""
+        if not self.outstanding:
+            await self.frame.send_message(CAPTURE_SETTINGS_MSG, self.capture_msg_bytes)
+            self.outstanding = True
+
+    async def next_photo(self):
+        """The JPEG bytes of the next photo, requesting it first unless request() already has"""
+        await self.request()
+        jpeg_bytes = await asyncio.wait_for(self.photo_queue.get(), self.timeout)
+        self.outstanding = False
+        return jpeg_bytes
+
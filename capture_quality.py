@@ -0,0 +1,46 @@
+import io
+import numpy as np
+from PIL import Image
+
+# Measured on a reduced copy of the capture so the score does not depend on resolution
+QUALITY_SAMPLE_SIZE = 320
+
+SHARPNESS_TARGET = 120.0
+CLIPPED_LEVEL = 250
+EDGE_LEVEL = 24
+EDGE_DENSITY_TARGET = 0.04
+MIN_QUALITY_SCORE = 0.35
+
+def _load_sample(jpeg_bytes):
+    image = Image.open(io.BytesIO(jpeg_bytes))
+    # let the JPEG decoder do the downscaling via DCT scaling, it skips most of the decode work
+    image.draft('L', (QUALITY_SAMPLE_SIZE, QUALITY_SAMPLE_SIZE))
+    image = image.convert('L')
+    image.thumbnail((QUALITY_SAMPLE_SIZE, QUALITY_SAMPLE_SIZE))
+    return np.asarray(image, dtype=np.float32)
+
+def score_capture(jpeg_bytes):
+    """Cheap quality score of a raw JPEG capture, before any OCR preprocessing"""
+    gray = _load_sample(jpeg_bytes)
+
+    laplacian = (gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:]
+                 - 4 * gray[1:-1, 1:-1])
+    sharpness = float(laplacian.var())
+
+    clipped = float((gray >= CLIPPED_LEVEL).mean())
+
+    grad_x = np.abs(gray[1:-1, 2:] - gray[1:-1, :-2])
+    grad_y = np.abs(gray[2:, 1:-1] - gray[:-2, 1:-1])
+    edge_density = float((np.maximum(grad_x, grad_y) >= EDGE_LEVEL).mean())
+
+    score = (min(1.0, sharpness / SHARPNESS_TARGET)
+             * (1.0 - clipped)
+             * min(1.0, edge_density / EDGE_DENSITY_TARGET))
+
+    return {
+        'score': score,
+        'sharpness': sharpness,
+        'clipped': clipped,
+        'edge_density': edge_density,
+        'usable': score >= MIN_QUALITY_SCORE,
+    }
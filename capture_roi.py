@@ -0,0 +1,88 @@
+"""
+Region of interest capture. A tiny low quality preview is taken first and the text located in it
+from edge density, which is cheap enough to run on every capture. The main capture is then panned
+to centre the text, taken at the resolution that text size calls for, and cropped to the text
+before OCR so preprocessing spends its pixels on the text rather than the rest of the view.
+
+The camera keeps its field of view at every resolution and pan moves the capture window along
+the photo's vertical axis, so panning can centre text vertically but not crop horizontally.
+"""
+import io
+import numpy as np
+from PIL import Image
+
+from capture_quality import EDGE_LEVEL, EDGE_DENSITY_TARGET
+
+PREVIEW_RESOLUTION = 256
+PREVIEW_QUALITY_INDEX = 0
+
+# the camera window is this many sensor pixels high and pan moves it by up to MAX_PAN of them,
+# with positive pan moving the view up in the upright photo
+CAMERA_WINDOW = 720
+MAX_PAN = 140
+PAN_DIRECTION = 1
+
+# a preview with fewer edges than this holds no text worth locating
+MIN_EDGE_DENSITY = EDGE_DENSITY_TARGET / 4
+# share of the preview's edges left outside the located region on each side, as outliers
+EDGE_TRIM = 0.02
+# rows with at least this share of the densest row's edge pixels are part of a line of text
+LINE_ROW_DENSITY = 0.7
+# margin kept around the text when cropping, as a fraction of the photo
+CROP_MARGIN = 0.04
+
+def _edge_map(jpeg_bytes):
+    gray = np.asarray(Image.open(io.BytesIO(jpeg_bytes)).convert('L'), dtype=np.float32)
+    grad_x = np.abs(gray[1:-1, 2:] - gray[1:-1, :-2])
+    grad_y = np.abs(gray[2:, 1:-1] - gray[:-2, 1:-1])
+    return np.maximum(grad_x, grad_y) >= EDGE_LEVEL
+
+def _trimmed_span(profile):
+    cumulative = np.cumsum(profile) / profile.sum()
+    start = int(np.searchsorted(cumulative, EDGE_TRIM))
+    end = int(np.searchsorted(cumulative, 1 - EDGE_TRIM)) + 1
+    return start, end
+
+def locate_text(jpeg_bytes):
+    """
+    The text region of a preview as (left, top, right, bottom) fractions of the photo and the
+    median text line height as a fraction of the photo height, or None if no text shows
+    """
+    edges = _edge_map(jpeg_bytes)
+    if edges.mean() < MIN_EDGE_DENSITY:
+        return None
+
+    height, width = edges.shape
+    top, bottom = _trimmed_span(edges.sum(axis=1))
+    left, right = _trimmed_span(edges[top:bottom].sum(axis=0))
+
+    # lines of text show as runs of rows dense in edges
+    row_density = edges[top:bottom, left:right].mean(axis=1)
+    dense = row_density >= LINE_ROW_DENSITY * row_density.max()
+    changes = np.flatnonzero(np.diff(np.concatenate(([0], dense.astype(np.int8), [0]))))
+    runs = changes[1::2] - changes[::2]
+    if not len(runs):
+        return None
+
+    return ((left / width, top / height, right / width, bottom / height),
+            float(np.median(runs)) / height)
+
+def pan_for_region(region, pan):
+    """The pan that brings the region's vertical centre to the middle of the photo, within MAX_PAN"""
+    centre = (region[1] + region[3]) / 2
+    wanted = pan + PAN_DIRECTION * round((0.5 - centre) * CAMERA_WINDOW)
+    return max(-MAX_PAN, min(MAX_PAN, wanted))
+
+def shift_region(region, old_pan, new_pan):
+    """The region as it appears in a photo taken at new_pan instead of old_pan"""
+    shift = PAN_DIRECTION * (new_pan - old_pan) / CAMERA_WINDOW
+    left, top, right, bottom = region
+    return left, top + shift, right, bottom + shift
+
+def crop_to_region(image, region):
+    """Crop a PIL image to the region plus CROP_MARGIN, clipped to the image"""
+    left, top, right, bottom = region
+    box = (max(0.0, left - CROP_MARGIN), max(0.0, top - CROP_MARGIN),
+           min(1.0, right + CROP_MARGIN), min(1.0, bottom + CROP_MARGIN))
+    return image.crop((round(box[0] * image.width), round(box[1] * image.height),
+                       round(box[2] * image.width), round(box[3] * image.height)))
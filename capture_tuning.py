@@ -0,0 +1,121 @@
+"""
+Automatic capture resolution and JPEG quality for OCR. Photo transfer dominates capture time and
+its size grows with both, so CaptureTuner picks the smallest settings that still read well. Text
+size is measured as a fraction of the photo, which does not depend on the resolution it was taken
+at, and the resolution is the smallest that gives the recent text enough pixels per line. Quality
+goes up as soon as OCR confidence drops below the target and back down after a run of captures
+that read comfortably above it.
+
+A region of interest preview measures line height from rows dense in edges, which is not the same
+thing as the word box height OCR reports. The tuner learns the ratio between the two from captures
+that have both, and only lets a preview pick the resolution once it has.
+"""
+from collections import deque
+from statistics import median
+
+from frame_msg import TxCaptureSettings
+
+# TxCaptureSettings takes resolutions from 256 to 720 and quality_index 0-4 (VERY_LOW to VERY_HIGH)
+RESOLUTIONS = (256, 320, 400, 480, 560, 640, 720)
+NUM_QUALITIES = 5
+
+# line height in capture pixels that Tesseract reads reliably once the photo is upscaled
+MIN_TEXT_HEIGHT = 14
+TEXT_HEIGHT_MARGIN = 1.25
+
+TARGET_CONFIDENCE = 75.0
+# a capture this far above the target counts towards stepping quality down
+CONFIDENCE_MARGIN = 10.0
+# captures in a row comfortably above the target before trying a lower quality
+STEP_DOWN_AFTER = 3
+HISTORY = 5
+
+def measure_text(data, photo_height):
+    """
+    Median word height as a fraction of the photo height and mean word confidence from the
+    pytesseract image_to_data() output of a capture, or None without words. photo_height is in the
+    OCR image's pixels, which for an image cropped from the photo is more than its own height
+    """
+    if data is None:
+        return None
+    words = [(height, float(conf)) for text, height, conf in zip(data['text'], data['height'], data['conf'])
+             if text.strip() and float(conf) >= 0]
+    if not words:
+        return None
+    return (median(height for height, _ in words) / photo_height,
+            sum(conf for _, conf in words) / len(words))
+
+class CaptureTuner:
+    """Chooses capture settings from the text size and OCR confidence of recent captures"""
+
+    def __init__(self, target_confidence=TARGET_CONFIDENCE, pan=-40):
+        self.target_confidence = target_confidence
+        self.pan = pan
+        # start high until there is something to go on
+        self.resolution = RESOLUTIONS[-1]
+        self.quality_index = 2
+        # lowest resolution allowed, raised when low confidence persists at the highest quality
+        self.min_resolution = RESOLUTIONS[0]
+        self.text_heights = deque(maxlen=HISTORY)
+        # OCR word height over preview line height, for captures that had a preview
+        self.preview_ratios = deque(maxlen=HISTORY)
+        self.good_run = 0
+
+    def capture_settings(self):
+        return TxCaptureSettings(resolution=self.resolution, quality_index=self.quality_index, pan=self.pan)
+
+    def resolution_for(self, text_height):
+        """The smallest allowed resolution giving text of this height (a fraction of the photo) enough pixels"""
+        wanted = MIN_TEXT_HEIGHT * TEXT_HEIGHT_MARGIN / text_height
+        for resolution in RESOLUTIONS:
+            if resolution >= max(wanted, self.min_resolution):
+                return resolution
+        return RESOLUTIONS[-1]
+
+    def resolution_for_preview(self, preview_line_height):
+        """
+        The resolution for text a preview measured at this line height, or the current resolution until
+        captures have related preview line heights to OCR word heights
+        """
+        if not self.preview_ratios:
+            return self.resolution
+        return self.resolution_for(preview_line_height * median(self.preview_ratios))
+
+    def _step_resolution(self, steps):
+        index = RESOLUTIONS.index(self.resolution) + steps
+        return RESOLUTIONS[max(0, min(len(RESOLUTIONS) - 1, index))]
+
+    def observe(self, resolution, quality_index, measurement, preview_line_height=None):
+        """
+        Update the settings from the measure_text() result of a capture taken at these settings, and
+        the line height its preview measured, if it had one
+        """
+        if measurement is None:
+            # no words found, the text may be too small to make out
+            self.good_run = 0
+            self.resolution = self._step_resolution(1)
+            return
+
+        text_height, confidence = measurement
+        self.text_heights.append(text_height)
+        if preview_line_height:
+            self.preview_ratios.append(text_height / preview_line_height)
+
+        if confidence < self.target_confidence:
+            self.good_run = 0
+            if quality_index < NUM_QUALITIES - 1:
+                self.quality_index = quality_index + 1
+            else:
+                # quality is maxed out, only more pixels can help
+                self.min_resolution = min(RESOLUTIONS[-1], max(self.min_resolution, self._step_resolution(1)))
+        elif confidence >= self.target_confidence + CONFIDENCE_MARGIN:
+            self.good_run += 1
+            if self.good_run >= STEP_DOWN_AFTER and self.quality_index > 0:
+                self.good_run = 0
+                self.quality_index -= 1
+        else:
+            self.good_run = 0
+
+        self.resolution = self.resolution_for(median(self.text_heights))
+        print(f"Capture tuning: text {text_height * resolution:.0f}px at {resolution}, confidence "
+              f"{confidence:.0f} -> next capture {self.resolution} quality {self.quality_index}")
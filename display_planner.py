@@ -0,0 +1,110 @@
+"""
+Chooses how a text is sent to Frame. Three routes can show it:
+
+- 'plain': TxPlainText drawn with Frame's built-in font by lua/plain_text_frame_app.lua. Only
+  honours the built-in font in Frame's default white on black.
+- 'sprites': one sprite per line cropped to its ink, placed by an offsets table, drawn by
+  lua/text_sprite_block_frame_app.lua. Any installed font and any colours.
+- 'page': full 256x256 bitmaps through an image sprite block. Any font and any colours.
+
+The BLE bytes and device draw time of each route are estimated from the layout alone, without
+rendering anything, and the cheapest route that honours the requested font and colours wins.
+"""
+import textwrap
+
+from font_index import find_font_file
+from text_layout import wrap_text_to_lines
+
+FRAME_FONT = 'Frame'
+DEFAULT_TEXT_RGB = (255, 255, 255)
+DEFAULT_BG_RGB = (0, 0, 0)
+
+DISPLAY_WIDTH = 640
+DISPLAY_HEIGHT = 400
+
+# lua/plain_text_frame_app.lua puts a line every 60 pixels, the built-in font averages about 22 across
+PLAIN_LINE_HEIGHT = 60
+PLAIN_CHAR_WIDTH = 22
+
+# rough throughput figures for Frame, only their ratios matter when comparing routes
+BLE_BYTES_PER_SECOND = 10000
+DEVICE_BITMAP_BYTES_PER_SECOND = 40000
+DEVICE_TEXT_CHARS_PER_SECOND = 2000
+# each message waits for Frame's processed ack, roughly this long on top of its bytes
+MESSAGE_GAP = 0.02
+
+SPRITE_HEADER_BYTES = 7
+PAGE_STRIPS = 8
+PAGE_BYTES = 256 * 256 // 8
+
+def layout_plain_pages(text):
+    """Wrap text for Frame's built-in font, returns pages of lines"""
+    # each line of the text wrapped on its own and blank lines kept, as wrap_text_to_lines does
+    lines = []
+    for paragraph in text.split('\n'):
+        lines.extend(textwrap.wrap(paragraph, width=DISPLAY_WIDTH // PLAIN_CHAR_WIDTH) or [''])
+    lines_per_page = DISPLAY_HEIGHT // PLAIN_LINE_HEIGHT
+    return [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+def layout_sprite_pages(text, font, line_height):
+    """Wrap text across the full display width, returns pages of lines for the line sprite route"""
+    lines = wrap_text_to_lines(text, font, max_width=DISPLAY_WIDTH - 16)
+    lines_per_page = max(1, DISPLAY_HEIGHT // line_height)
+    return [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+def _cost(sent_bytes, messages, draw_seconds):
+    return {
+        'bytes': sent_bytes,
+        'messages': messages,
+        'seconds': sent_bytes / BLE_BYTES_PER_SECOND + messages * MESSAGE_GAP + draw_seconds,
+    }
+
+def estimate_plain(text):
+    pages = layout_plain_pages(text)
+    chars = sum(len(line) + 1 for page in pages for line in page)
+    return _cost(chars + 6 * len(pages), len(pages), chars / DEVICE_TEXT_CHARS_PER_SECOND)
+
+def estimate_sprites(text, font, line_height, palette_size=6):
+    pages = layout_sprite_pages(text, font, line_height)
+    sent_bytes = draw_bytes = messages = 0
+    resident = set()
+    for page in pages:
+        messages += 1
+        for line in page:
+            if not line.strip():
+                continue
+            # line sprites are cropped to the ink, widened to whole bytes
+            left, top, right, bottom = font.getbbox(line)
+            pixel_bytes = (right // 8 + 1 - left // 8) * (bottom - top)
+            sent_bytes += 6
+            draw_bytes += pixel_bytes
+            # lines Frame still holds from the previous page are only placed, not sent again
+            if line not in resident:
+                sent_bytes += 2 + SPRITE_HEADER_BYTES + palette_size + pixel_bytes
+                messages += 1
+        resident = set(page)
+    return _cost(sent_bytes, messages, draw_bytes / DEVICE_BITMAP_BYTES_PER_SECOND)
+
+def estimate_page(num_pages, palette_size=6):
+    strip_bytes = SPRITE_HEADER_BYTES + palette_size + PAGE_BYTES // PAGE_STRIPS
+    return _cost(num_pages * (9 + PAGE_STRIPS * strip_bytes), num_pages * (1 + PAGE_STRIPS),
+                 num_pages * PAGE_BYTES / DEVICE_BITMAP_BYTES_PER_SECOND)
+
+def plan_display(text, font, line_height, num_pages, settings, text_rgb, bg_rgb):
+    """
+    Estimate every route that honours the settings, returns (route, estimates) with estimates
+    keyed by route. num_pages is the page count of the 256x256 page layout.
+    """
+    font_name = settings.get('font', 'Comic Sans MS Bold.ttf')
+    default_colors = text_rgb == DEFAULT_TEXT_RGB and bg_rgb == DEFAULT_BG_RGB
+
+    estimates = {}
+    if font_name == FRAME_FONT:
+        if default_colors:
+            estimates['plain'] = estimate_plain(text)
+    elif find_font_file(font_name) is not None:
+        estimates['sprites'] = estimate_sprites(text, font, line_height)
+    estimates['page'] = estimate_page(num_pages)
+
+    route = min(estimates, key=lambda name: estimates[name]['seconds'])
+    return route, estimates
@@ -0,0 +1,80 @@
+"""
+Acknowledgement-based flow control for messages sent to the display frame apps.
+
+After handling incoming messages the frame app reports how many it has processed so far on
+PROCESSED_ACK_MSG. Instead of sleeping a fixed time after each message, the host keeps at most
+`window` messages sent but not yet processed. The window grows by one after each window's
+worth of acks and halves when an ack does not arrive in time, so the sending rate follows
+what Frame can absorb: fast while it is idle, slower while it is drawing or collecting garbage.
+The frame apps queue complete messages in lua/message_queue.lua rather than in the data library's
+single slot per message code, so several messages of one code can be in flight at once.
+"""
+import asyncio
+
+PROCESSED_ACK_MSG = 0x30
+
+class MessageWindow:
+    """Sends messages to a frame app that acks on PROCESSED_ACK_MSG, with a bounded number in flight"""
+
+    def __init__(self, frame, max_window=4, ack_timeout=1.0):
+        self.frame = frame
+        self.max_window = max_window
+        self.ack_timeout = ack_timeout
+        self.window = 1
+        self.sent = 0
+        self.processed = 0
+        # messages given up on after an ack timeout, presumably lost on the way
+        self.lost = 0
+        self._acked_in_window = 0
+        self._ack = asyncio.Event()
+        frame.register_data_response_handler(self, [PROCESSED_ACK_MSG], self.handle_data)
+
+    @property
+    def in_flight(self):
+        return self.sent - self.processed - self.lost
+
+    def handle_data(self, data):
+        # the frame app's count wraps at 16 bits
+        newly_processed = ((data[1] << 8 | data[2]) - self.processed) & 0xFFFF
+        if not newly_processed or newly_processed > self.sent - self.processed:
+            return
+        self.processed += newly_processed
+        # a message given up on was only slow after all
+        self.lost = min(self.lost, self.sent - self.processed)
+
+        self._acked_in_window += newly_processed
+        if self._acked_in_window >= self.window:
+            self._acked_in_window = 0
+            self.window = min(self.max_window, self.window + 1)
+        self._ack.set()
+
+    async def _wait_for_ack(self, in_flight):
+        """Wait until at most in_flight messages are unprocessed, backing off on each ack timeout"""
+        if self.in_flight > in_flight and hasattr(self.frame, 'flush'):
+            # nothing more will be sent until an ack comes, so don't leave messages sitting in a batch
+            await self.frame.flush()
+        while self.in_flight > in_flight:
+            self._ack.clear()
+            try:
+                await asyncio.wait_for(self._ack.wait(), self.ack_timeout)
+            except asyncio.TimeoutError:
+                print(f"No ack from Frame in {self.ack_timeout}s, {self.in_flight} messages in flight")
+                self.window = max(1, self.window // 2)
+                self._acked_in_window = 0
+                self.lost += 1
+
+    async def send_message(self, msg_code, payload):
+        await self._wait_for_ack(self.window - 1)
+        await self.frame.send_message(msg_code, payload)
+        self.sent += 1
+
+    async def drain(self):
+        """Wait until Frame has processed everything sent"""
+        await self._wait_for_ack(0)
+
+    def close(self):
+        self.frame.unregister_data_response_handler(self)
+
+    def __getattr__(self, name):
+        # anything other than sending goes straight to the FrameMsg connection
+        return getattr(self.frame, name)
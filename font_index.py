@@ -0,0 +1,84 @@
+"""
+Font discovery and a shared cache of loaded fonts, so that no font file is searched for
+or parsed on the per-request display path.
+"""
+import os
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import ImageFont
+
+REPO_FONT_DIR = Path(__file__).resolve().parent / 'frame_msg' / 'fonts'
+
+if sys.platform == 'darwin':
+    SYSTEM_FONT_DIRS = ['/System/Library/Fonts', '/Library/Fonts', '~/Library/Fonts']
+elif sys.platform == 'win32':
+    SYSTEM_FONT_DIRS = [os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')]
+else:
+    SYSTEM_FONT_DIRS = ['/usr/share/fonts', '/usr/local/share/fonts', '~/.local/share/fonts', '~/.fonts']
+
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+REGULAR_STYLES = ('regular', 'book', 'roman', 'normal', 'medium')
+
+_font_index = None
+
+def _normalize(name):
+    name = Path(name).stem if name.lower().endswith(FONT_EXTENSIONS) else name
+    return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+def build_font_index(font_dirs=None):
+    """Scan the repo and system font directories once and map font names to files"""
+    global _font_index
+    if font_dirs is None:
+        font_dirs = [REPO_FONT_DIR] + SYSTEM_FONT_DIRS
+
+    index = {}
+    for font_dir in font_dirs:
+        font_dir = Path(font_dir).expanduser()
+        if not font_dir.is_dir():
+            continue
+        for path in sorted(font_dir.rglob('*')):
+            if path.suffix.lower() not in FONT_EXTENSIONS:
+                continue
+            path = str(path)
+            index.setdefault(_normalize(os.path.basename(path)), path)
+            try:
+                family, style = ImageFont.truetype(path, 12).getname()
+            except Exception:
+                continue
+            if not family:
+                continue
+            index.setdefault(_normalize(f"{family} {style or ''}"), path)
+            if not style or style.lower() in REGULAR_STYLES:
+                index[_normalize(family)] = path
+            else:
+                index.setdefault(_normalize(family), path)
+
+    _font_index = index
+    return index
+
+def find_font_file(font_name):
+    """Look up a font file by file name, family name or 'family style' name"""
+    if _font_index is None:
+        build_font_index()
+    if os.path.isfile(font_name):
+        return font_name
+    return _font_index.get(_normalize(font_name))
+
+@lru_cache(maxsize=64)
+def get_font(font_file, font_size):
+    return ImageFont.truetype(font_file, font_size)
+
+@lru_cache(maxsize=1)
+def _default_font():
+    return ImageFont.load_default()
+
+def load_font(font_name, font_size):
+    """Return a shared font object for font_name at font_size, or the default font if it is not installed"""
+    font_file = find_font_file(font_name)
+    if font_file is None:
+        print(f"Font {font_name} not found in font index, using default")
+        return _default_font()
+    return get_font(font_file, font_size)
@@ -0,0 +1,241 @@
+"""
+A Frame connection kept open across requests. Connecting used to start with a BLE scan on every
+request. FrameLink connects once, remembers the device address on disk and connects to it
+directly next time, scanning only if that fails. A keepalive task checks the idle link and
+reconnects as soon as it drops, before the next request needs it.
+
+FrameBle.connect can only scan, so connecting by address repeats what it does once it has found
+the device, down to a private Bleak MTU workaround. That is tied to the frame-ble releases listed in
+DIRECT_CONNECT_FRAME_BLE. With any other release a link connects by scanning for the Frame's name.
+
+FrameDevices keeps one FrameLink per configured Frame, addressed by the two character ID Frame
+shows, so one host can serve several glasses at once. Without configured IDs it keeps a single link
+to whichever Frame is found. Frame stops advertising once connected, so the two are not mixed.
+"""
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from importlib.metadata import PackageNotFoundError, version
+
+from bleak import BleakClient, BleakError
+from frame_ble import FrameBle
+from frame_msg import FrameMsg
+
+# a direct connection to a device that is in range is quick, so give up on it well before a scan would
+DIRECT_CONNECT_TIMEOUT = 4.0
+# frame-ble major.minor releases whose FrameBle.connect _connect_address follows
+DIRECT_CONNECT_FRAME_BLE = ('1.1',)
+KEEPALIVE_INTERVAL = 15.0
+
+def direct_connect_supported():
+    try:
+        frame_ble_version = version('frame-ble')
+    except PackageNotFoundError:
+        return False
+    return '.'.join(frame_ble_version.split('.')[:2]) in DIRECT_CONNECT_FRAME_BLE
+
+def load_cached_address(cache_path):
+    try:
+        with open(cache_path) as f:
+            return json.load(f).get('address')
+    except (OSError, ValueError):
+        return None
+
+def save_cached_address(cache_path, address):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, 'w') as f:
+        json.dump({'address': address}, f)
+
+class CachedAddressFrameBle(FrameBle):
+    """A FrameBle that connects to a known address directly and falls back to scanning"""
+
+    def __init__(self, address=None, name=None, on_disconnect=lambda: None):
+        super().__init__()
+        self.address = address
+        self.name = name
+        self.on_disconnect = on_disconnect
+
+    def _disconnect_handler(self, client):
+        # FrameBle resets itself on disconnect, keep what it doesn't know about
+        address, name, on_disconnect = self.address, self.name, self.on_disconnect
+        super()._disconnect_handler(client)
+        self.address, self.name, self.on_disconnect = address, name, on_disconnect
+        on_disconnect()
+
+    async def _connect_address(self, address, timeout, print_response_handler, data_response_handler,
+                               disconnect_handler):
+        # the same as FrameBle.connect once it has found the device, as of the DIRECT_CONNECT_FRAME_BLE releases
+        self._user_disconnect_handler = disconnect_handler
+        self._user_print_response_handler = print_response_handler
+        self._user_data_response_handler = data_response_handler
+
+        self._client = BleakClient(
+            address,
+            disconnected_callback=self._disconnect_handler,
+            timeout=timeout,
+            winrt=dict(use_cached_services=False)
+        )
+        try:
+            await self._client.connect()
+            # Workaround to acquire MTU size because Bleak doesn't do it automatically when using BlueZ backend
+            if self._client._backend.__class__.__name__ == "BleakClientBlueZDBus":
+                await self._client._backend._acquire_mtu()
+        except BleakError as ble_error:
+            raise Exception(f"Error connecting: {ble_error}")
+
+        service = self._client.services.get_service(self._SERVICE_UUID)
+        self._tx_characteristic = service.get_characteristic(self._TX_CHARACTERISTIC_UUID)
+        self._rx_characteristic = service.get_characteristic(self._RX_CHARACTERISTIC_UUID)
+        await self._client.start_notify(self._RX_CHARACTERISTIC_UUID, self._notification_handler)
+
+    async def connect(self, name=None, timeout=10, print_response_handler=lambda _: None,
+                      data_response_handler=lambda _: None, disconnect_handler=lambda: None):
+        if self.address is not None and direct_connect_supported():
+            try:
+                await self._connect_address(self.address, DIRECT_CONNECT_TIMEOUT, print_response_handler,
+                                            data_response_handler, disconnect_handler)
+                return self.address
+            except Exception as e:
+                print(f"Could not connect to Frame at {self.address} directly ({e}), scanning")
+                if self.is_connected():
+                    await self.disconnect()
+
+        self.address = await super().connect(name or self.name, timeout, print_response_handler,
+                                             data_response_handler, disconnect_handler)
+        return self.address
+
+class FrameLink:
+    """One Frame connection shared by requests in turn, kept alive while idle"""
+
+    def __init__(self, cache_path, name=None, keepalive_interval=KEEPALIVE_INTERVAL):
+        self.cache_path = cache_path
+        self.name = name
+        self.keepalive_interval = keepalive_interval
+        self.frame = None
+        # held by whoever is using the link, requests and keepalive checks alike
+        self.lock = asyncio.Lock()
+        # requests waiting for the lock, which hands it over in arrival order
+        self.queued = 0
+        self._link_lost = asyncio.Event()
+        self._keepalive_task = None
+
+    def is_connected(self):
+        return self.frame is not None and self.frame.is_connected()
+
+    async def _connect(self):
+        frame = FrameMsg()
+        frame.ble = CachedAddressFrameBle(load_cached_address(self.cache_path), self.name, self._link_lost.set)
+        await frame.connect()
+        save_cached_address(self.cache_path, frame.ble.address)
+        self.frame = frame
+
+    async def _drop(self):
+        frame, self.frame = self.frame, None
+        if frame is not None:
+            try:
+                await frame.disconnect()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def session(self):
+        """Exclusive use of the connected Frame, left as a fresh connection would find it if the user fails"""
+        self.queued += 1
+        try:
+            await self.lock.acquire()
+        finally:
+            self.queued -= 1
+        try:
+            if not self.is_connected():
+                await self._connect()
+            try:
+                yield self.frame
+            except BaseException:
+                try:
+                    await self.frame.stop_frame_app()
+                except Exception:
+                    await self._drop()
+                raise
+        finally:
+            self.lock.release()
+
+    def status(self):
+        return {
+            'connected': self.is_connected(),
+            'address': self.frame.ble.address if self.is_connected() else load_cached_address(self.cache_path),
+            'busy': self.lock.locked(),
+            'queued': self.queued,
+        }
+
+    async def _check(self):
+        try:
+            if self.is_connected():
+                await self.frame.ble.send_lua('print(1)', await_print=True)
+            else:
+                await self._connect()
+                print(f"Connected to Frame at {self.frame.ble.address}")
+        except Exception as e:
+            print(f"Frame link check failed: {e}")
+            await self._drop()
+
+    async def _keepalive(self):
+        while True:
+            # a request holding the link shows well enough whether it works
+            if not self.lock.locked():
+                async with self.lock:
+                    await self._check()
+            # the check has dealt with any drop so far, a failed reconnect waits for the next round
+            self._link_lost.clear()
+            try:
+                await asyncio.wait_for(self._link_lost.wait(), self.keepalive_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Connect in the background and keep the link up from now on"""
+        self._keepalive_task = asyncio.ensure_future(self._keepalive())
+
+    async def close(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+        async with self.lock:
+            await self._drop()
+
+class FrameDevices:
+    """
+    A FrameLink per configured Frame, by the ID Frame shows (e.g. '4F'), or a single link under None
+    for whichever Frame is found when no IDs are configured
+    """
+
+    def __init__(self, cache_dir, device_ids=(), keepalive_interval=KEEPALIVE_INTERVAL):
+        self.cache_dir = cache_dir
+        self.device_ids = tuple(device_ids) or (None,)
+        self.keepalive_interval = keepalive_interval
+        self.links = {}
+
+    def link(self, device_id=None):
+        """The link to a configured device, started the first time it is asked for. KeyError for any other"""
+        if device_id not in self.device_ids:
+            raise KeyError(f"Frame {device_id} is not configured" if device_id else "Frame ID required")
+        if device_id not in self.links:
+            if device_id is None:
+                link = FrameLink(os.path.join(self.cache_dir, 'frame_device.json'), None, self.keepalive_interval)
+            else:
+                link = FrameLink(os.path.join(self.cache_dir, f'frame_device_{device_id}.json'),
+                                 f'Frame {device_id}', self.keepalive_interval)
+            link.start()
+            self.links[device_id] = link
+        return self.links[device_id]
+
+    def start(self):
+        """Connect to every configured device in the background"""
+        for device_id in self.device_ids:
+            self.link(device_id)
+
+    def status(self):
+        return {device_id or 'any': link.status() for device_id, link in self.links.items()}
+
+    async def close(self):
+        for link in self.links.values():
+            await link.close()
@@ -1,11 +1,61 @@
 import asyncio
+from dataclasses import dataclass
 from PIL import Image
 import io
-import numpy as np
+import struct
 import keyboard
 
 from frame_msg import FrameMsg, RxPhoto, TxCaptureSettings, TxSprite, TxImageSpriteBlock
 
+@dataclass
+class TxPackedSprite(TxSprite):
+    """
+    A TxSprite whose pixel_data is already packed (e.g. straight from a PIL mode '1' image),
+    so there's no need to unpack it to one byte per pixel just for pack() to pack it again
+    """
+    def pack(self) -> bytes:
+        header = struct.pack('>HHBBB', self.width, self.height, 0, self.bpp, self.num_colors)
+        return b''.join((header, self.palette_data, self.pixel_data))
+
+class TxPackedImageSpriteBlock(TxImageSpriteBlock):
+    """Splits a TxPackedSprite into strips that are zero-copy slices of its packed buffer"""
+    def _split_into_lines(self):
+        stride = self.image.width * self.image.bpp // 8
+        pixels = memoryview(self.image.pixel_data)
+        for start_y in range(0, self.image.height, self.sprite_line_height):
+            line_height = min(self.sprite_line_height, self.image.height - start_y)
+            self.sprite_lines.append(TxPackedSprite(
+                width=self.image.width,
+                height=line_height,
+                num_colors=self.image.num_colors,
+                palette_data=self.image.palette_data,
+                pixel_data=pixels[start_y * stride:(start_y + line_height) * stride]))
+
+def jpeg_to_image_sprite_block(jpeg_bytes):
+    # load the image with PIL
+    image = Image.open(io.BytesIO(jpeg_bytes))
+    # '1': black and white with dither
+    image = image.convert('1')
+
+    # the '1' image bytes are already packed at 1bpp (256 pixels wide, so rows are whole bytes)
+    sprite = TxPackedSprite(width=256,
+                    height=256,
+                    num_colors=2,
+                    palette_data=bytes([0,0,0,255,255,255]),
+                    pixel_data=image.tobytes())
+
+    # Split the image into chunks as an ImageSpriteBlock rendered progressively
+    return TxPackedImageSpriteBlock(sprite, sprite_line_height=32)
+
+async def send_image_sprite_block(frame, isb):
+    # Note that the frameside app is expecting a message of type TxImageSpriteBlock on msgCode 0x20
+    # send the Image Sprite Block header
+    await frame.send_message(0x20, isb.pack())
+
+    # then send all the slices
+    for spr in isb.sprite_lines:
+        await frame.send_message(0x20, spr.pack())
+
 async def main():
     """
     Repeatedly take photos using the Frame camera and display them on the Frame display
@@ -60,41 +110,28 @@ async def main():
 
         print("Camera capture/display loop starting: Press 'q' to quit")
 
-        while not key_pressed:
+        loop = asyncio.get_running_loop()
 
-            # Request the photo capture
-            await frame.send_message(0x0d, capture_msg_bytes)
+        # ask for the first photo, after that the next one is always requested as soon as a photo
+        # arrives, so Frame takes and sends it while the host dithers and packs the one it has
+        await frame.send_message(0x0d, capture_msg_bytes)
 
-            # get the jpeg bytes as soon as they're ready
-            jpeg_bytes = await asyncio.wait_for(photo_queue.get(), timeout=10.0)
+        # the image sprite block of the last photo, shown once the next photo has arrived so that
+        # its messages never reach Frame while it is busy capturing
+        isb = None
 
-            # load the image with PIL
-            image = Image.open(io.BytesIO(jpeg_bytes))
-            # '1': black and white with dither
-            image = image.convert('1')
-
-            # regrettably need to unpack the nicely packed bits into bytes
-            data_array = np.frombuffer(image.tobytes(), dtype=np.uint8)
-            unpacked = np.unpackbits(data_array)
-
-            # extract pixel data from unpacked.tobytes() at 1bpp and create TxSprite manually
-            sprite = TxSprite(width=256,
-                            height=256,
-                            num_colors=2,
-                            palette_data=bytes([0,0,0,255,255,255]),
-                            pixel_data=unpacked.tobytes())
+        while not key_pressed:
 
-            # Quantize and send the image to Frame in chunks as an ImageSpriteBlock rendered progressively
-            # Note that the frameside app is expecting a message of type TxImageSpriteBlock on msgCode 0x20
-            isb = TxImageSpriteBlock(sprite, sprite_line_height=32)
+            # get the jpeg bytes as soon as they're ready
+            jpeg_bytes = await asyncio.wait_for(photo_queue.get(), timeout=10.0)
 
-            # send the Image Sprite Block header
-            await frame.send_message(0x20, isb.pack())
+            if isb is not None:
+                await send_image_sprite_block(frame, isb)
 
-            # then send all the slices
-            for spr in isb.sprite_lines:
-                await frame.send_message(0x20, spr.pack())
+            # Request the next photo capture
+            await frame.send_message(0x0d, capture_msg_bytes)
 
+            isb = await loop.run_in_executor(None, jpeg_to_image_sprite_block, jpeg_bytes)
 
         # stop the photo receiver and clean up its resources
         rx_photo.detach(frame)
@@ -111,6 +111,11 @@ async def main():
         await asyncio.sleep(5.0)
         print("Starting continuous capture")
 
+        capture_msg_bytes = TxCaptureSettings(resolution=720).pack()
+
+        # Request the first photo
+        await frame.send_message(0x0d, capture_msg_bytes)
+
         # Main capture loop
         capture_count = 0
         while True:
@@ -118,21 +123,19 @@ async def main():
                 print("Display window closed, exiting...")
                 break
                 
-            # Request a photo
-            await frame.send_message(0x0d, TxCaptureSettings(resolution=720).pack())
-            
             # get the jpeg bytes
             jpeg_bytes = await asyncio.wait_for(photo_queue.get(), timeout=10.0)
             
+            # Request the next photo straight away, Frame captures and sends it
+            # while the display thread decodes and shows this one
+            await frame.send_message(0x0d, capture_msg_bytes)
+            
             # Update the display
             display_thread.update_image(jpeg_bytes)
             
             capture_count += 1
             print(f"Captured frame {capture_count}", end="\r")
             
-            # Small delay between captures
-            await asyncio.sleep(0.1)  # Adjust this value as needed
-            
     except asyncio.CancelledError:
         print("\nCapture loop cancelled")
     except Exception as e:
@@ -0,0 +1,88 @@
+"""
+Per-line text sprites for lua/text_sprite_block_frame_app.lua. Each wrapped line is rendered once
+into a sprite cropped to its ink and cached by (line text, font and size, colours). Frame keeps
+the line sprites it has been sent under a line id and draws them from an offsets table, so a
+re-layout that only moves lines (a page turn back, a spacing change) sends just the new lines
+and a 6-byte offset per line.
+"""
+import asyncio
+import struct
+from collections import OrderedDict
+
+import numpy as np
+from packed_sprite import TxPackedSprite
+from region_display import DISPLAY_WIDTH, ink_bounds
+from text_layout import font_key
+from text_render import render_page_bits
+
+LINE_SPRITE_MSG = 0x20
+LINE_OFFSETS_MSG = 0x21
+
+MAX_CACHED_LINES = 1024
+
+_line_sprites = OrderedDict()
+
+def render_line_sprite(line, font, palette_data):
+    """Return (packed sprite, x, y) of line cropped to its ink, x and y relative to the pen position, or None if blank"""
+    key = (line, font_key(font), palette_data)
+    if key in _line_sprites:
+        _line_sprites.move_to_end(key)
+        return _line_sprites[key]
+
+    rendered = None
+    height = max(1, font.getbbox(line)[3])
+    bits = render_page_bits([line], font, height, width=DISPLAY_WIDTH, height=height, left=0)
+    bounds = ink_bounds(bits)
+    if bounds is not None:
+        left, top, right, bottom = bounds
+        sprite = TxPackedSprite(
+            width=right - left,
+            height=bottom - top,
+            num_colors=len(palette_data) // 3,
+            palette_data=palette_data,
+            pixel_data=np.packbits(bits[top:bottom, left:right], axis=1).tobytes()
+        )
+        rendered = (sprite.pack(), left, top)
+
+    if len(_line_sprites) >= MAX_CACHED_LINES:
+        _line_sprites.popitem(last=False)
+    _line_sprites[key] = rendered
+    return rendered
+
+def render_line_sprites(lines, font, palette_data):
+    return [render_line_sprite(line, font, palette_data) for line in lines]
+
+class LineSpriteDisplay:
+    """Sends lines to Frame as line sprites, re-using the ones it already holds, rendered on executor"""
+
+    def __init__(self, frame, executor):
+        self.frame = frame
+        self.executor = executor
+        self.line_ids = {}
+        self.resident = set()
+
+    async def show_lines(self, lines, font, line_height, palette_data, left=4, top=0):
+        """Draw lines top to bottom from (left, top), returns the number of payload bytes sent"""
+        sent = 0
+        placements = []
+        all_rendered = await asyncio.get_running_loop().run_in_executor(
+            self.executor, render_line_sprites, lines, font, palette_data)
+        for row, (line, rendered) in enumerate(zip(lines, all_rendered)):
+            if rendered is None:
+                continue
+            sprite, x, y = rendered
+
+            line_id = self.line_ids.setdefault((line, font_key(font), palette_data), len(self.line_ids))
+            if line_id not in self.resident:
+                payload = struct.pack('>H', line_id) + sprite
+                await self.frame.send_message(LINE_SPRITE_MSG, payload)
+                self.resident.add(line_id)
+                sent += len(payload)
+
+            placements.append((line_id, left + x, top + row * line_height + y))
+
+        # Frame drops the line sprites that are not in the table, keep track of what it still holds
+        payload = b''.join(struct.pack('>HHH', *placement) for placement in placements)
+        await self.frame.send_message(LINE_OFFSETS_MSG, payload)
+        self.resident = {line_id for line_id, _, _ in placements}
+        return sent + len(payload)
@@ -1,4 +1,5 @@
 local data = require('data.min')
+local message_queue = require('message_queue')
 local camera = require('camera.min')
 local image_sprite_block = require('image_sprite_block.min')
 
@@ -34,7 +35,7 @@ function app_loop()
         rc, err = pcall(
             function()
 				-- process any raw data items, if ready (parse into take_photo, then clear data.app_data_block)
-				local items_ready = data.process_raw_items()
+				local items_ready = message_queue.process_raw_items()
 
 				if items_ready > 0 then
 
@@ -74,13 +75,21 @@ function app_loop()
 						end
 					end
 
+					-- acknowledge once the messages have been handled, so the ack also covers drawing time
+					message_queue.ack_processed(items_ready)
+
 				end
 
 				if camera.is_auto_exp then
 					camera.run_auto_exposure()
 				end
 
-				frame.sleep(0.1)
+				-- queued messages are handed over one of each code per loop, so only sleep briefly while some are left
+				if message_queue.has_queued() then
+					frame.sleep(0.001)
+				else
+					frame.sleep(0.1)
+				end
 			end
 		)
 		-- Catch the break signal here and clean up the display
@@ -1,4 +1,5 @@
 local data = require('data.min')
+local message_queue = require('message_queue')
 local image_sprite_block = require('image_sprite_block.min')
 
 -- Phone to Frame flags
@@ -20,7 +21,7 @@ function app_loop()
         rc, err = pcall(
             function()
 				-- process any raw data items, if ready
-				local items_ready = data.process_raw_items()
+				local items_ready = message_queue.process_raw_items()
 
 				-- one or more full messages received
 				if items_ready > 0 then
@@ -64,6 +65,9 @@ function app_loop()
 						end
 					end
 
+					-- acknowledge once the messages have been handled, so the ack also covers drawing time
+					message_queue.ack_processed(items_ready)
+
 				end
 
 				-- can't sleep for long, might be lots of incoming bluetooth data to process
@@ -0,0 +1,90 @@
+-- Module shared by the display frame apps for taking in messages from the host.
+-- The data library keeps a single app_data_block slot per message code, so a message that
+-- completes before the previous one of its code has been parsed would overwrite it. This module
+-- moves every message off its slot as soon as it is complete and queues it in arrival order,
+-- unpacks batch messages in place, and acks the number of messages processed back to the host.
+local data = require('data.min')
+
+local _M = {}
+
+-- Phone to Frame flags
+local BATCH = 0x40
+
+-- Frame to Phone flags
+local PROCESSED_ACK = 0x30
+
+-- complete messages { code, block } in the order they arrived
+local queued = {}
+
+-- running count of processed messages, acked so the host can pace what it sends
+local processed = 0
+
+-- wrap the data library's receive callback: whenever a packet completes a message, take the
+-- message out of its slot and queue it, so the slot is free for the next message of that code
+local accumulate = data.update_app_data_accum
+frame.bluetooth.receive_callback(function(packet)
+	accumulate(packet)
+	local code = string.byte(packet, 1)
+	local block = data.app_data_block[code]
+	if block ~= nil then
+		data.app_data_block[code] = nil
+		table.insert(queued, { code = code, block = block })
+	end
+end)
+
+-- Parse a batch message: [msg code(Uint8), length(Uint16), payload] for each message in it
+function _M.parse_batch(data_block)
+	local messages = {}
+	local i = 1
+	while i <= string.len(data_block) do
+		local length = string.byte(data_block, i + 1) << 8 | string.byte(data_block, i + 2)
+		table.insert(messages, { code = string.byte(data_block, i), block = string.sub(data_block, i + 3, i + 2 + length) })
+		i = i + 3 + length
+	end
+	return messages
+end
+
+-- Parse queued messages into data.app_data in arrival order, at most one of each code per call
+-- so the app handles each message before the next of its code replaces it.
+-- Returns the number of messages parsed (batches themselves are not counted, their contents are)
+function _M.process_raw_items()
+	local items = 0
+	local parsed = {}
+	while queued[1] ~= nil and not parsed[queued[1].code] do
+		local message = table.remove(queued, 1)
+		if message.code == BATCH then
+			-- the batched messages take the batch's place at the front of the queue
+			for i, batched in ipairs(_M.parse_batch(message.block)) do
+				table.insert(queued, i, batched)
+			end
+		elseif data.parsers[message.code] == nil then
+			-- still counts as processed, the host is waiting for it to be
+			print('Error: No parser for flag: ' .. tostring(message.code))
+			items = items + 1
+		else
+			data.app_data[message.code] = data.parsers[message.code](message.block, data.app_data[message.code])
+			parsed[message.code] = true
+			items = items + 1
+		end
+	end
+	if items > 0 then
+		collectgarbage('collect')
+	end
+	return items
+end
+
+-- true while messages are waiting for a later process_raw_items() call
+function _M.has_queued()
+	return queued[1] ~= nil
+end
+
+-- tell the host how many messages have been processed so far (Uint16, wrapping)
+function _M.ack_processed(count)
+	processed = (processed + count) % 65536
+	-- if the Bluetooth is busy, this simply tries again until it gets through
+	while not pcall(frame.bluetooth.send, string.char(PROCESSED_ACK, processed >> 8, processed & 0xFF)) do
+		frame.sleep(0.0025)
+	end
+end
+
+return _M
@@ -1,4 +1,5 @@
 local data = require('data.min')
+local message_queue = require('message_queue')
 local plain_text = require('plain_text.min')
 
 -- Phone to Frame flags
@@ -30,7 +31,7 @@ function app_loop()
         rc, err = pcall(
             function()
 				-- process any raw data items, if ready
-				local items_ready = data.process_raw_items()
+				local items_ready = message_queue.process_raw_items()
 
 				-- one or more full messages received
 				if items_ready > 0 then
@@ -45,6 +46,9 @@ function app_loop()
 						collectgarbage('collect')
 					end
 
+					-- acknowledge once the messages have been handled, so the ack also covers drawing time
+					message_queue.ack_processed(items_ready)
+
 				end
 
 				-- can't sleep for long, might be lots of incoming bluetooth data to process
@@ -0,0 +1,93 @@
+local data = require('data.min')
+local message_queue = require('message_queue')
+local sprite = require('sprite.min')
+local code = require('code.min')
+
+-- Phone to Frame flags
+REGION_STRIP = 0x20
+CODE_DRAW = 0x50
+
+-- strips of the page being received, drawn together on CODE_DRAW
+local strips = {}
+
+-- Parse a region strip message: x(Uint16), y(Uint16) of the strip's top left corner, then a TxSprite
+function parse_region_strip(data_block)
+	local strip = {}
+	strip.x = string.byte(data_block, 1) << 8 | string.byte(data_block, 2)
+	strip.y = string.byte(data_block, 3) << 8 | string.byte(data_block, 4)
+	strip.sprite = sprite.parse_sprite(string.sub(data_block, 5))
+	return strip
+end
+
+-- register the message parsers so they are automatically called when matching data comes in
+data.parsers[REGION_STRIP] = parse_region_strip
+data.parsers[CODE_DRAW] = code.parse_code
+
+-- draw the received strips, everything outside them is left as background
+function draw_strips()
+	for index, strip in ipairs(strips) do
+		local spr = strip.sprite
+
+		-- all the strips of a page share a palette, set it from the first one
+		if index == 1 then
+			sprite.set_palette(spr.num_colors, spr.palette_data)
+		end
+
+		frame.display.bitmap(strip.x + 1, strip.y + 1, spr.width, 2^spr.bpp, 0, spr.pixel_data)
+	end
+	frame.display.show()
+end
+
+-- Main app loop
+function app_loop()
+	frame.display.text('Frame App Started', 1, 1)
+	frame.display.show()
+
+	-- tell the host program that the frameside app is ready (waiting on await_print)
+	print('Frame app is running')
+
+	while true do
+        rc, err = pcall(
+            function()
+				-- process any raw data items, if ready
+				local items_ready = message_queue.process_raw_items()
+
+				-- one or more full messages received
+				if items_ready > 0 then
+
+					-- hold the strip until the whole page has arrived
+					if data.app_data[REGION_STRIP] ~= nil then
+						table.insert(strips, data.app_data[REGION_STRIP])
+						data.app_data[REGION_STRIP] = nil
+					end
+
+					-- show the page and start collecting the next one
+					if data.app_data[CODE_DRAW] ~= nil then
+						data.app_data[CODE_DRAW] = nil
+						draw_strips()
+						strips = {}
+						collectgarbage('collect')
+					end
+
+					-- acknowledge once the messages have been handled, so the ack also covers drawing time
+					message_queue.ack_processed(items_ready)
+
+				end
+
+				-- can't sleep for long, might be lots of incoming bluetooth data to process
+				frame.sleep(0.001)
+			end
+		)
+		-- Catch an error (including the break signal) here
+		if rc == false then
+			-- send the error back on the stdout stream and clear the display
+			print(err)
+			frame.display.text(' ', 1, 1)
+			frame.display.show()
+			break
+		end
+	end
+end
+
+-- run the main app loop
+app_loop()
@@ -0,0 +1,126 @@
+local data = require('data.min')
+local message_queue = require('message_queue')
+local sprite = require('sprite.min')
+local code = require('code.min')
+
+-- Phone to Frame flags
+STRIP_SPRITE = 0x20
+STRIP_PALETTE = 0x21
+CLEAR_REGION = 0x22
+CODE_DRAW = 0x50
+
+-- strips making up the current screen, keyed by their y offset
+local strips = {}
+
+-- Parse a strip message: strip y offset(Uint16), blank rows trimmed from the top of the strip(Uint8),
+-- then a TxSprite holding the strip's remaining rows
+function parse_strip(data_block)
+	local strip = {}
+	strip.y = string.byte(data_block, 1) << 8 | string.byte(data_block, 2)
+	strip.top = string.byte(data_block, 3)
+	strip.sprite = sprite.parse_sprite(string.sub(data_block, 4))
+	return strip
+end
+
+-- Parse a clear region message: y offset(Uint16), height(Uint16)
+function parse_clear_region(data_block)
+	local region = {}
+	region.y = string.byte(data_block, 1) << 8 | string.byte(data_block, 2)
+	region.height = string.byte(data_block, 3) << 8 | string.byte(data_block, 4)
+	return region
+end
+
+-- Parse a palette message: Uint8 r, g, b for each color
+function parse_palette(data_block)
+	local palette = {}
+	palette.num_colors = string.len(data_block) // 3
+	palette.data = data_block
+	return palette
+end
+
+-- register the message parsers so they are automatically called when matching data comes in
+data.parsers[STRIP_SPRITE] = parse_strip
+data.parsers[STRIP_PALETTE] = parse_palette
+data.parsers[CLEAR_REGION] = parse_clear_region
+data.parsers[CODE_DRAW] = code.parse_code
+
+-- the display is cleared on every show(), so redraw all the held strips each time
+function draw_strips()
+	for y, strip in pairs(strips) do
+		local spr = strip.sprite
+		frame.display.bitmap(1, y + strip.top + 1, spr.width, 2^spr.bpp, 0, spr.pixel_data)
+	end
+	frame.display.show()
+end
+
+-- Main app loop
+function app_loop()
+	frame.display.text('Frame App Started', 1, 1)
+	frame.display.show()
+
+	-- tell the host program that the frameside app is ready (waiting on await_print)
+	print('Frame app is running')
+
+	while true do
+        rc, err = pcall(
+            function()
+				-- process any raw data items, if ready
+				local items_ready = message_queue.process_raw_items()
+
+				-- one or more full messages received
+				if items_ready > 0 then
+
+					-- set the palette used by all the strips
+					if data.app_data[STRIP_PALETTE] ~= nil then
+						local palette = data.app_data[STRIP_PALETTE]
+						sprite.set_palette(palette.num_colors, palette.data)
+						data.app_data[STRIP_PALETTE] = nil
+					end
+
+					-- replace the strip at this offset, it is drawn on the next CODE_DRAW
+					if data.app_data[STRIP_SPRITE] ~= nil then
+						local strip = data.app_data[STRIP_SPRITE]
+						strips[strip.y] = strip
+						data.app_data[STRIP_SPRITE] = nil
+					end
+
+					-- blank strips are not drawn at all, the background shows through
+					if data.app_data[CLEAR_REGION] ~= nil then
+						local region = data.app_data[CLEAR_REGION]
+						for y, _ in pairs(strips) do
+							if y >= region.y and y < region.y + region.height then
+								strips[y] = nil
+							end
+						end
+						data.app_data[CLEAR_REGION] = nil
+					end
+
+					-- draw all the strips and show them
+					if data.app_data[CODE_DRAW] ~= nil then
+						data.app_data[CODE_DRAW] = nil
+						draw_strips()
+						collectgarbage('collect')
+					end
+
+					-- acknowledge once the messages have been handled, so the ack also covers drawing time
+					message_queue.ack_processed(items_ready)
+
+				end
+
+				-- can't sleep for long, might be lots of incoming bluetooth data to process
+				frame.sleep(0.001)
+			end
+		)
+		-- Catch an error (including the break signal) here
+		if rc == false then
+			-- send the error back on the stdout stream and clear the display
+			print(err)
+			frame.display.text(' ', 1, 1)
+			frame.display.show()
+			break
+		end
+	end
+end
+
+-- run the main app loop
+app_loop()
@@ -0,0 +1,201 @@
+local data = require('data.min')
+local message_queue = require('message_queue')
+local sprite = require('sprite.min')
+
+-- Phone to Frame flags
+PAGE_LINE = 0x20
+PAGE_END = 0x21
+READER_START = 0x22
+
+-- Frame to Phone flags
+PAGE_SHOWN = 0x31
+
+-- a second tap within this many seconds of the first turns back instead of forward
+DOUBLE_TAP_TIME = 0.3
+
+-- pages held on Frame, keyed by page number: the page being shown and the ones either side
+local pages = {}
+local page_count = 0
+local current = 0
+local palette_set = false
+
+-- taps are counted in the tap callback and handled in the main loop
+local pending_taps = 0
+local last_tap_time = 0
+local tap_origin = 0
+
+-- Parse a page line message: page(Uint16), x(Uint16), y(Uint16), then a TxSprite
+function parse_page_line(data_block)
+	local line = {}
+	line.page = string.byte(data_block, 1) << 8 | string.byte(data_block, 2)
+	line.x = string.byte(data_block, 3) << 8 | string.byte(data_block, 4)
+	line.y = string.byte(data_block, 5) << 8 | string.byte(data_block, 6)
+	line.sprite = sprite.parse_sprite(string.sub(data_block, 7))
+	return line
+end
+
+-- Parse a page end message: page(Uint16), number of lines sent for the page(Uint16)
+function parse_page_end(data_block)
+	local page_end = {}
+	page_end.page = string.byte(data_block, 1) << 8 | string.byte(data_block, 2)
+	page_end.lines = string.byte(data_block, 3) << 8 | string.byte(data_block, 4)
+	return page_end
+end
+
+-- Parse a reader start message: number of pages(Uint16)
+function parse_reader_start(data_block)
+	return string.byte(data_block, 1) << 8 | string.byte(data_block, 2)
+end
+
+-- register the message parsers so they are automatically called when matching data comes in
+data.parsers[PAGE_LINE] = parse_page_line
+data.parsers[PAGE_END] = parse_page_end
+data.parsers[READER_START] = parse_reader_start
+
+function on_tap()
+	pending_taps = pending_taps + 1
+end
+
+-- only the shown page and its neighbours are kept
+function in_window(page)
+	return page >= current - 1 and page <= current + 1
+end
+
+function show_current_page()
+	local page = pages[current]
+	if page == nil or not page.complete then
+		frame.display.text('Loading...', 1, 1)
+		frame.display.show()
+		return
+	end
+
+	for _, line in ipairs(page.lines) do
+		local spr = line.sprite
+
+		-- all the pages share a palette, set it once
+		if not palette_set then
+			sprite.set_palette(spr.num_colors, spr.palette_data)
+			palette_set = true
+		end
+
+		frame.display.bitmap(line.x + 1, line.y + 1, spr.width, 2^spr.bpp, 0, spr.pixel_data)
+	end
+	frame.display.show()
+end
+
+-- show the new page straight from memory, then tell the host so it can load the new neighbours
+function turn_to(page)
+	current = page
+	for held, _ in pairs(pages) do
+		if not in_window(held) then
+			pages[held] = nil
+		end
+	end
+	show_current_page()
+
+	local held = 0
+	if pages[current] ~= nil and pages[current].complete then
+		held = 1
+	end
+	while not pcall(frame.bluetooth.send, string.char(PAGE_SHOWN, current >> 8, current & 0xFF, held)) do
+		frame.sleep(0.0025)
+	end
+	collectgarbage('collect')
+end
+
+-- one tap turns forward right away, a quick second tap takes it back to the page before
+function handle_tap()
+	local now = frame.time.utc()
+	if now - last_tap_time < DOUBLE_TAP_TIME then
+		last_tap_time = 0
+		turn_to(math.max(0, tap_origin - 1))
+	else
+		last_tap_time = now
+		tap_origin = current
+		turn_to(math.min(page_count - 1, current + 1))
+	end
+end
+
+-- Main app loop
+function app_loop()
+	frame.display.text('Frame App Started', 1, 1)
+	frame.display.show()
+
+	-- tell the host program that the frameside app is ready (waiting on await_print)
+	print('Frame app is running')
+
+	while true do
+        rc, err = pcall(
+            function()
+				-- process any raw data items, if ready
+				local items_ready = message_queue.process_raw_items()
+
+				-- one or more full messages received
+				if items_ready > 0 then
+
+					-- start reading from the first page and listen for taps
+					if data.app_data[READER_START] ~= nil then
+						page_count = data.app_data[READER_START]
+						data.app_data[READER_START] = nil
+						current = 0
+						pages = {}
+						frame.imu.tap_callback(on_tap)
+						show_current_page()
+					end
+
+					-- lines for pages no longer near the shown one are dropped
+					if data.app_data[PAGE_LINE] ~= nil then
+						local line = data.app_data[PAGE_LINE]
+						data.app_data[PAGE_LINE] = nil
+						if in_window(line.page) then
+							if pages[line.page] == nil or pages[line.page].complete then
+								pages[line.page] = { lines = {}, complete = false }
+							end
+							table.insert(pages[line.page].lines, line)
+						end
+					end
+
+					-- a page is complete if none of its lines went missing
+					if data.app_data[PAGE_END] ~= nil then
+						local page_end = data.app_data[PAGE_END]
+						data.app_data[PAGE_END] = nil
+						if in_window(page_end.page) then
+							local page = pages[page_end.page]
+							if page == nil then
+								page = { lines = {} }
+								pages[page_end.page] = page
+							end
+							page.complete = #page.lines == page_end.lines
+							if page_end.page == current then
+								show_current_page()
+							end
+						end
+					end
+
+					-- acknowledge once the messages have been handled, so the ack also covers drawing time
+					message_queue.ack_processed(items_ready)
+
+				end
+
+				if pending_taps > 0 then
+					pending_taps = pending_taps - 1
+					handle_tap()
+				end
+
+				-- can't sleep for long, might be lots of incoming bluetooth data to process
+				frame.sleep(0.001)
+			end
+		)
+		-- Catch an error (including the break signal) here
+		if rc == false then
+			-- send the error back on the stdout stream and clear the display
+			print(err)
+			frame.display.text(' ', 1, 1)
+			frame.display.show()
+			break
+		end
+	end
+end
+
+-- run the main app loop
+app_loop()
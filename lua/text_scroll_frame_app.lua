@@ -0,0 +1,123 @@
+local data = require('data.min')
+local message_queue = require('message_queue')
+local sprite = require('sprite.min')
+
+-- Phone to Frame flags
+LINE_SPRITE = 0x20
+SCROLL_POSITION = 0x41
+
+-- height of the scrolling viewport on the display
+local VIEW_HEIGHT = 400
+
+-- line sprites currently held on Frame, keyed by line index
+local lines = {}
+local palette_set = false
+
+-- Parse a line sprite message: line index(Uint16), document y(Uint32), then a TxSprite
+function parse_line_sprite(data_block)
+	local line = {}
+	line.index = string.byte(data_block, 1) << 8 | string.byte(data_block, 2)
+	line.y = string.byte(data_block, 3) << 24 | string.byte(data_block, 4) << 16 | string.byte(data_block, 5) << 8 | string.byte(data_block, 6)
+	line.sprite = sprite.parse_sprite(string.sub(data_block, 7))
+	return line
+end
+
+-- Parse a scroll position message: offset(Uint32), first_line(Uint16), last_line(Uint16)
+-- Lines outside first_line..last_line are no longer needed by the host and can be dropped
+function parse_scroll_position(data_block)
+	local position = {}
+	position.offset = string.byte(data_block, 1) << 24 | string.byte(data_block, 2) << 16 | string.byte(data_block, 3) << 8 | string.byte(data_block, 4)
+	position.first_line = string.byte(data_block, 5) << 8 | string.byte(data_block, 6)
+	position.last_line = string.byte(data_block, 7) << 8 | string.byte(data_block, 8)
+	return position
+end
+
+-- register the message parsers so they are automatically called when matching data comes in
+data.parsers[LINE_SPRITE] = parse_line_sprite
+data.parsers[SCROLL_POSITION] = parse_scroll_position
+
+-- draw every held line that shows in the viewport at the given scroll offset, lines
+-- crossing the top or bottom edge clipped to the rows inside it
+function draw_lines(position)
+	for index, line in pairs(lines) do
+		if index < position.first_line or index > position.last_line then
+			lines[index] = nil
+		else
+			local spr = line.sprite
+			local y = line.y - position.offset
+			local top = math.max(0, -y)
+			local bottom = math.min(spr.height, VIEW_HEIGHT - y)
+			if top < bottom then
+				-- packed sprite rows are whole bytes, so the visible rows are one substring
+				local stride = spr.width * spr.bpp // 8
+				local pixel_data = spr.pixel_data
+				if top > 0 or bottom < spr.height then
+					pixel_data = string.sub(pixel_data, top * stride + 1, bottom * stride)
+				end
+				frame.display.bitmap(1, y + top + 1, spr.width, 2^spr.bpp, 0, pixel_data)
+			end
+		end
+	end
+	frame.display.show()
+end
+
+-- Main app loop
+function app_loop()
+	frame.display.text('Frame App Started', 1, 1)
+	frame.display.show()
+
+	-- tell the host program that the frameside app is ready (waiting on await_print)
+	print('Frame app is running')
+
+	while true do
+        rc, err = pcall(
+            function()
+				-- process any raw data items, if ready
+				local items_ready = message_queue.process_raw_items()
+
+				-- one or more full messages received
+				if items_ready > 0 then
+
+					-- keep the line sprite for drawing at later scroll positions
+					if data.app_data[LINE_SPRITE] ~= nil then
+						local line = data.app_data[LINE_SPRITE]
+
+						-- all the lines share a palette, set it once
+						if not palette_set then
+							sprite.set_palette(line.sprite.num_colors, line.sprite.palette_data)
+							palette_set = true
+						end
+
+						lines[line.index] = line
+						data.app_data[LINE_SPRITE] = nil
+					end
+
+					-- redraw the viewport at the new scroll position
+					if data.app_data[SCROLL_POSITION] ~= nil then
+						draw_lines(data.app_data[SCROLL_POSITION])
+						data.app_data[SCROLL_POSITION] = nil
+						collectgarbage('collect')
+					end
+
+					-- acknowledge once the messages have been handled, so the ack also covers drawing time
+					message_queue.ack_processed(items_ready)
+
+				end
+
+				-- can't sleep for long, might be lots of incoming bluetooth data to process
+				frame.sleep(0.001)
+			end
+		)
+		-- Catch an error (including the break signal) here
+		if rc == false then
+			-- send the error back on the stdout stream and clear the display
+			print(err)
+			frame.display.text(' ', 1, 1)
+			frame.display.show()
+			break
+		end
+	end
+end
+
+-- run the main app loop
+app_loop()
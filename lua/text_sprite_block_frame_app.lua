@@ -1,12 +1,60 @@
 local data = require('data.min')
-local text_sprite_block = require('text_sprite_block.min')
+local message_queue = require('message_queue')
+local sprite = require('sprite.min')
 
 -- Phone to Frame flags
-TEXT_SPRITE_BLOCK = 0x20
+LINE_SPRITE = 0x20
+LINE_OFFSETS = 0x21
+
+-- line sprites held on Frame, keyed by the line id the host gave them
+local lines = {}
+
+-- Parse a line sprite message: line id(Uint16), then a TxSprite
+function parse_line_sprite(data_block)
+	local line = {}
+	line.id = string.byte(data_block, 1) << 8 | string.byte(data_block, 2)
+	line.sprite = sprite.parse_sprite(string.sub(data_block, 3))
+	return line
+end
+
+-- Parse a line offsets message: [line id(Uint16), x(Uint16), y(Uint16)] for each line to draw
+function parse_line_offsets(data_block)
+	local offsets = {}
+	for i = 0, string.len(data_block) // 6 - 1 do
+		local b = i * 6
+		local offset = {}
+		offset.id = string.byte(data_block, b + 1) << 8 | string.byte(data_block, b + 2)
+		offset.x = string.byte(data_block, b + 3) << 8 | string.byte(data_block, b + 4)
+		offset.y = string.byte(data_block, b + 5) << 8 | string.byte(data_block, b + 6)
+		table.insert(offsets, offset)
+	end
+	return offsets
+end
 
 -- register the message parsers so they are automatically called when matching data comes in
-data.parsers[TEXT_SPRITE_BLOCK] = text_sprite_block.parse_text_sprite_block
+data.parsers[LINE_SPRITE] = parse_line_sprite
+data.parsers[LINE_OFFSETS] = parse_line_offsets
+
+-- draw the listed lines at their offsets, lines that are not listed are no longer needed
+function draw_lines(offsets)
+	local kept = {}
+	for index, offset in ipairs(offsets) do
+		local line = lines[offset.id]
+		if line ~= nil then
+			local spr = line.sprite
+
+			-- all the lines share a palette, set it from the first one
+			if index == 1 then
+				sprite.set_palette(spr.num_colors, spr.palette_data)
+			end
 
+			frame.display.bitmap(offset.x + 1, offset.y + 1, spr.width, 2^spr.bpp, 0, spr.pixel_data)
+			kept[offset.id] = line
+		end
+	end
+	lines = kept
+	frame.display.show()
+end
 
 -- Main app loop
 function app_loop()
@@ -20,35 +68,28 @@ function app_loop()
         rc, err = pcall(
             function()
 				-- process any raw data items, if ready
-				local items_ready = data.process_raw_items()
+				local items_ready = message_queue.process_raw_items()
 
 				-- one or more full messages received
 				if items_ready > 0 then
 
-					if (data.app_data[TEXT_SPRITE_BLOCK] ~= nil) then
-						-- show the text sprite block
-						local tsb = data.app_data[TEXT_SPRITE_BLOCK]
-
-						-- it can be that we haven't got any sprites yet, so only proceed if we have a sprite
-						if tsb.first_sprite_index > 0 then
-							-- either we have all the sprites, or we want to do progressive/incremental rendering
-							if tsb.progressive_render or (tsb.active_sprites == tsb.total_sprites) then
-
-								-- for index = 1, tsb.active_sprites do
-								-- 		local spr = tsb.sprites[index]
-								-- 		local y_offset = 50 * (index - 1) -- TODO get proper offsets
-
-								-- 		frame.display.bitmap(1, y_offset + 1, spr.width, 2^spr.bpp, 0, spr.pixel_data)
-								-- end
-								for index, spr in ipairs(tsb.sprites) do
-									frame.display.bitmap(1, tsb.offsets[index].y + 1, spr.width, 2^spr.bpp, 0+index, spr.pixel_data)
-								end
+					-- keep the line sprite until an offsets table stops listing it
+					if data.app_data[LINE_SPRITE] ~= nil then
+						local line = data.app_data[LINE_SPRITE]
+						lines[line.id] = line
+						data.app_data[LINE_SPRITE] = nil
+					end
 
-								frame.display.show()
-							end
-						end
+					-- draw the lines at their new offsets
+					if data.app_data[LINE_OFFSETS] ~= nil then
+						draw_lines(data.app_data[LINE_OFFSETS])
+						data.app_data[LINE_OFFSETS] = nil
+						collectgarbage('collect')
 					end
 
+					-- acknowledge once the messages have been handled, so the ack also covers drawing time
+					message_queue.ack_processed(items_ready)
+
 				end
 
 				-- can't sleep for long, might be lots of incoming bluetooth data to process
@@ -67,4 +108,4 @@ function app_loop()
 end
 
 -- run the main app loop
-app_loop()
\ No newline at end of file
+app_loop()
@@ -0,0 +1,61 @@
+"""
+Sprites built straight from packed 1/2/4-bpp pixel buffers.
+
+TxSprite takes one byte per pixel and packs it in pack(), so a buffer that is already packed
+(a PIL mode '1' image, a rendered text page) has to be unpacked with np.unpackbits first only
+to be packed again. These variants take the packed buffer as-is and slice image sprite block
+strips out of it as zero-copy memoryviews.
+"""
+import struct
+from dataclasses import dataclass
+
+import lz4.frame
+from frame_msg import TxSprite, TxImageSpriteBlock
+
+@dataclass
+class TxPackedSprite(TxSprite):
+    """
+    A TxSprite whose pixel_data is already packed at its bpp, MSB first.
+    Rows must be whole bytes (width * bpp a multiple of 8), which also makes any
+    run of rows a contiguous slice of the buffer.
+    """
+
+    def __post_init__(self):
+        if (self.width * self.bpp) % 8:
+            raise ValueError(f"packed sprite rows must be whole bytes: width {self.width} at {self.bpp}bpp")
+        expected = self.width * self.height * self.bpp // 8
+        if len(self.pixel_data) != expected:
+            raise ValueError(f"packed pixel_data is {len(self.pixel_data)} bytes, expected {expected}")
+
+    def pack(self) -> bytes:
+        header = struct.pack('>HHBBB',
+            self.width,
+            self.height,
+            int(self.compress),
+            self.bpp,
+            self.num_colors
+        )
+
+        packed_pixels = self.pixel_data
+        if self.compress:
+            packed_pixels = lz4.frame.compress(packed_pixels, compression_level=9)
+
+        return b''.join((header, self.palette_data, packed_pixels))
+
+class TxPackedImageSpriteBlock(TxImageSpriteBlock):
+    """A TxImageSpriteBlock over a TxPackedSprite, with strips sliced as memoryviews of its buffer"""
+
+    def _split_into_lines(self):
+        stride = self.image.width * self.image.bpp // 8
+        pixels = memoryview(self.image.pixel_data)
+
+        for start_y in range(0, self.image.height, self.sprite_line_height):
+            line_height = min(self.sprite_line_height, self.image.height - start_y)
+            self.sprite_lines.append(TxPackedSprite(
+                width=self.image.width,
+                height=line_height,
+                num_colors=self.image.num_colors,
+                palette_data=self.image.palette_data,
+                pixel_data=pixels[start_y * stride:(start_y + line_height) * stride],
+                compress=self.image.compress
+            ))
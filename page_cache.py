@@ -0,0 +1,117 @@
+"""
+Content-addressed cache of packed display pages (the exact message payloads sent to Frame),
+with a size-bounded in-memory LRU tier in front of a size-bounded on-disk tier. Reads from the
+disk tier, writes to it and its eviction all run on a background thread, off the event loop.
+"""
+import asyncio
+import hashlib
+import os
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+def page_cache_key(*parts):
+    """Hash everything that affects the rendered pages into a cache key"""
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+def _pages_size(pages):
+    return sum(len(message) for messages in pages for message in messages)
+
+def _serialize(pages):
+    chunks = [struct.pack('>I', len(pages))]
+    for messages in pages:
+        chunks.append(struct.pack('>H', len(messages)))
+        for message in messages:
+            chunks.append(struct.pack('>I', len(message)))
+            chunks.append(message)
+    return b''.join(chunks)
+
+def _deserialize(data):
+    view = memoryview(data)
+    (page_count,) = struct.unpack_from('>I', view, 0)
+    offset = 4
+    pages = []
+    for _ in range(page_count):
+        (message_count,) = struct.unpack_from('>H', view, offset)
+        offset += 2
+        messages = []
+        for _ in range(message_count):
+            (length,) = struct.unpack_from('>I', view, offset)
+            offset += 4
+            messages.append(bytes(view[offset:offset + length]))
+            offset += length
+        pages.append(messages)
+    return pages
+
+class PageCache:
+    def __init__(self, cache_dir, max_memory_bytes=32 * 1024 * 1024, max_disk_bytes=256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        # a single thread keeps disk reads, writes and evictions in order
+        self._disk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='page-cache')
+
+    async def get(self, key):
+        """Return the cached pages (a list of message lists) for key, or None"""
+        pages = self._memory.get(key)
+        if pages is not None:
+            self._memory.move_to_end(key)
+            return pages
+
+        pages = await asyncio.get_running_loop().run_in_executor(self._disk_executor, self._read_disk, key)
+        if pages is not None:
+            self._remember(key, pages)
+        return pages
+
+    def _read_disk(self, key):
+        path = self.cache_dir / f"{key}.pages"
+        try:
+            pages = _deserialize(path.read_bytes())
+            os.utime(path)
+        except (OSError, struct.error):
+            return None
+        return pages
+
+    def put(self, key, pages):
+        """Cache pages in memory now and on disk in the background, returning the disk write's future"""
+        self._remember(key, pages)
+        return self._disk_executor.submit(self._write_disk, key, pages)
+
+    def _write_disk(self, key, pages):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{key}.pages"
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_bytes(_serialize(pages))
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError as e:
+            print(f"Page cache write failed: {e}")
+
+    def _remember(self, key, pages):
+        size = _pages_size(pages)
+        if size > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= _pages_size(self._memory.pop(key))
+        self._memory[key] = pages
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= _pages_size(evicted)
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*.pages'):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
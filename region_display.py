@@ -0,0 +1,48 @@
+"""
+Full-display text pages at Frame's native 640x400. Pages are laid out and rendered across the
+whole display, and only the bounding box of the inked pixels (widened to whole bytes) is sent,
+as strips positioned by x, y, to lua/region_frame_app.lua.
+"""
+import struct
+
+import numpy as np
+from frame_msg import TxCode
+from packed_sprite import TxPackedSprite
+from text_render import render_page_bits
+
+DISPLAY_WIDTH = 640
+DISPLAY_HEIGHT = 400
+
+REGION_STRIP_MSG = 0x20
+CODE_DRAW_MSG = 0x50
+
+def ink_bounds(page):
+    """(left, top, right, bottom) of the inked pixels of a boolean page with left and right on byte boundaries, None for a blank page"""
+    rows = np.flatnonzero(page.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(page.any(axis=0))
+    return int(cols[0]) // 8 * 8, int(rows[0]), (int(cols[-1]) // 8 + 1) * 8, int(rows[-1]) + 1
+
+def pack_region_messages(page_lines, font, line_height, palette_data, strip_height=32):
+    """Render page_lines across the full display, returns (msg_code, payload) for each strip of the inked region and the draw"""
+    page = render_page_bits(page_lines, font, line_height, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT)
+    messages = []
+
+    bounds = ink_bounds(page)
+    if bounds is not None:
+        left, top, right, bottom = bounds
+        region = np.packbits(page[top:bottom, left:right], axis=1)
+        for y in range(0, bottom - top, strip_height):
+            rows = region[y:y + strip_height]
+            sprite = TxPackedSprite(
+                width=right - left,
+                height=len(rows),
+                num_colors=2,
+                palette_data=palette_data,
+                pixel_data=rows.tobytes()
+            )
+            messages.append((REGION_STRIP_MSG, struct.pack('>HH', left, top + y) + sprite.pack()))
+
+    messages.append((CODE_DRAW_MSG, TxCode().pack()))
+    return messages
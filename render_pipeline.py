@@ -0,0 +1,51 @@
+"""
+Bounded producer/consumer pipeline between page rendering and BLE sending. A producer task
+renders pages one after another on a render thread and puts the results on a bounded
+asyncio.Queue, while the display loop consumes them and sends. Rendering carries on while
+the link is busy and sending carries on while the next page renders, and the queue bound
+caps how far ahead (and how much memory) the producer can get.
+"""
+import asyncio
+
+_DONE = object()
+
+async def _produce(queue, pages, render, args, executor, split):
+    loop = asyncio.get_running_loop()
+    try:
+        for page_num, page in enumerate(pages):
+            rendered = await loop.run_in_executor(executor, render, page, *args)
+            if split:
+                for message in rendered:
+                    await queue.put((page_num, message))
+                await queue.put((page_num, None))
+            else:
+                await queue.put((page_num, rendered))
+    except Exception as e:
+        await queue.put(e)
+        return
+    await queue.put(_DONE)
+
+async def _consume(pages, render, args, executor, max_queued, split):
+    queue = asyncio.Queue(maxsize=max_queued)
+    producer = asyncio.create_task(_produce(queue, pages, render, args, executor, split))
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+
+def rendered_pages(pages, render, *args, executor, max_queued):
+    """Yield (page_num, render(page, *args)) for each page, with up to max_queued pages rendered ahead"""
+    return _consume(pages, render, args, executor, max_queued, split=False)
+
+def rendered_messages(pages, render, *args, executor, max_queued):
+    """
+    Yield (page_num, message) for each message of render(page, *args) and (page_num, None) at the
+    end of each page, with up to max_queued messages rendered ahead
+    """
+    return _consume(pages, render, args, executor, max_queued, split=True)
@@ -0,0 +1,95 @@
+"""
+Differential page updates: the page is split into fixed-height strips and only the strips whose
+packed bytes differ from what Frame is currently showing are sent, each with its y offset,
+to lua/strip_update_frame_app.lua.
+
+Pages of text are mostly background, so blank rows at the top and bottom of a strip are trimmed
+before sending, and strips that have become entirely blank are replaced by a 4-byte clear region
+message (consecutive ones merged into one region) instead of a strip of background pixels.
+"""
+import struct
+
+import numpy as np
+from frame_msg import TxCode
+from packed_sprite import TxPackedSprite
+
+STRIP_SPRITE_MSG = 0x20
+STRIP_PALETTE_MSG = 0x21
+CLEAR_REGION_MSG = 0x22
+CODE_DRAW_MSG = 0x50
+
+class StripDisplay:
+    """Tracks the strips Frame is showing and sends only the ones that change"""
+
+    def __init__(self, frame, width=256, height=256, strip_height=32):
+        self.frame = frame
+        self.width = width
+        self.height = height
+        self.strip_height = strip_height
+        self.shown = {}
+        self.palette_data = None
+
+    def plan_page(self, page_bits):
+        """
+        Compare page_bits with what is shown. Returns (updates, clear_regions): updates are
+        (y, top, strip, rows) for changed strips with ink, rows being the packed strip with blank
+        rows above top and below the last inked row trimmed; clear_regions are (y, height) runs
+        of shown strips that are now blank.
+        """
+        stride = self.width // 8
+        view = memoryview(page_bits)
+        rows_with_ink = np.frombuffer(page_bits, dtype=np.uint8).reshape(self.height, stride).any(axis=1)
+
+        updates = []
+        clear_regions = []
+        for y in range(0, self.height, self.strip_height):
+            strip_height = min(self.strip_height, self.height - y)
+            ink = np.flatnonzero(rows_with_ink[y:y + strip_height])
+
+            if not len(ink):
+                if y in self.shown:
+                    if clear_regions and sum(clear_regions[-1]) == y:
+                        clear_regions[-1] = (clear_regions[-1][0], clear_regions[-1][1] + strip_height)
+                    else:
+                        clear_regions.append((y, strip_height))
+                continue
+
+            strip = view[y * stride:(y + strip_height) * stride]
+            if self.shown.get(y) != strip:
+                top, bottom = int(ink[0]), int(ink[-1]) + 1
+                updates.append((y, top, strip, view[(y + top) * stride:(y + bottom) * stride]))
+
+        return updates, clear_regions
+
+    async def show_page(self, page_bits, palette_data):
+        """Bring Frame's screen to page_bits, returns the number of payload bytes sent"""
+        sent = 0
+        if palette_data != self.palette_data:
+            await self.frame.send_message(STRIP_PALETTE_MSG, palette_data)
+            self.palette_data = palette_data
+            sent += len(palette_data)
+
+        updates, clear_regions = self.plan_page(page_bits)
+
+        for y, height in clear_regions:
+            payload = struct.pack('>HH', y, height)
+            await self.frame.send_message(CLEAR_REGION_MSG, payload)
+            for cleared in range(y, y + height, self.strip_height):
+                del self.shown[cleared]
+            sent += len(payload)
+
+        for y, top, strip, rows in updates:
+            sprite = TxPackedSprite(
+                width=self.width,
+                height=len(rows) * 8 // self.width,
+                num_colors=len(palette_data) // 3,
+                palette_data=palette_data,
+                pixel_data=rows
+            )
+            payload = struct.pack('>HB', y, top) + sprite.pack()
+            await self.frame.send_message(STRIP_SPRITE_MSG, payload)
+            self.shown[y] = bytes(strip)
+            sent += len(payload)
+
+        await self.frame.send_message(CODE_DRAW_MSG, TxCode().pack())
+        return sent
@@ -0,0 +1,83 @@
+"""
+Tap-to-turn reading mode. lua/tap_reader_frame_app.lua turns pages itself when Frame is tapped
+(one tap forward, a double tap back) from pages already held in its memory, so a page turn
+needs no BLE transfer. After each turn it reports the page it is showing, and the host sends
+it whichever of that page and its two neighbours it does not hold yet.
+"""
+import asyncio
+import struct
+
+from line_sprites import render_line_sprite
+
+PAGE_LINE_MSG = 0x20
+PAGE_END_MSG = 0x21
+READER_START_MSG = 0x22
+PAGE_SHOWN_MSG = 0x31
+
+# stop reading when Frame has not been tapped for this long
+READER_IDLE_TIMEOUT = 300
+
+class TapReader:
+    """Keeps the page Frame is showing and its neighbours loaded on Frame"""
+
+    def __init__(self, frame, pages, font, line_height, palette_data, executor, left=4):
+        self.frame = frame
+        self.pages = pages
+        self.font = font
+        self.line_height = line_height
+        self.palette_data = palette_data
+        # pages are rendered on the executor, off the event loop
+        self.executor = executor
+        self.left = left
+        self.resident = set()
+        self.shown = None
+
+    def pack_page(self, page_num):
+        """Payloads of the page's line sprites, each prefixed with the page number and position"""
+        payloads = []
+        for row, line in enumerate(self.pages[page_num]):
+            rendered = render_line_sprite(line, self.font, self.palette_data)
+            if rendered is not None:
+                sprite, x, y = rendered
+                payloads.append(struct.pack('>HHH', page_num, self.left + x, row * self.line_height + y) + sprite)
+        return payloads
+
+    async def send_page(self, page_num):
+        payloads = await asyncio.get_running_loop().run_in_executor(self.executor, self.pack_page, page_num)
+        for payload in payloads:
+            await self.frame.send_message(PAGE_LINE_MSG, payload)
+        await self.frame.send_message(PAGE_END_MSG, struct.pack('>HH', page_num, len(payloads)))
+
+    def handle_data(self, data):
+        page_num, held = struct.unpack('>HB', data[1:4])
+        self.shown.put_nowait((page_num, bool(held)))
+
+    async def read(self, idle_timeout=READER_IDLE_TIMEOUT):
+        """Serve page turns until Frame goes idle_timeout seconds without one"""
+        self.shown = asyncio.Queue()
+        self.frame.register_data_response_handler(self, [PAGE_SHOWN_MSG], self.handle_data)
+        try:
+            current, held = 0, False
+            await self.frame.send_message(READER_START_MSG, struct.pack('>H', len(self.pages)))
+            while True:
+                if not held:
+                    self.resident.discard(current)
+                # Frame drops pages more than one away from the one it shows
+                wanted = [page for page in (current, current + 1, current - 1) if 0 <= page < len(self.pages)]
+                self.resident &= set(wanted)
+                for page_num in wanted:
+                    if page_num not in self.resident:
+                        await self.send_page(page_num)
+                        self.resident.add(page_num)
+
+                try:
+                    current, held = await asyncio.wait_for(self.shown.get(), idle_timeout)
+                except asyncio.TimeoutError:
+                    print(f"No page turn for {idle_timeout}s, stopping")
+                    break
+                # only the latest page matters if Frame turned several while pages were being sent
+                while not self.shown.empty():
+                    current, held = self.shown.get_nowait()
+                print(f"Frame turned to page {current + 1}/{len(self.pages)}")
+        finally:
+            self.frame.unregister_data_response_handler(self)
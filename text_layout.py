@@ -0,0 +1,81 @@
+"""
+Text layout helpers for rendering OCR text onto Frame's display.
+"""
+
+# Word metrics are cached per font and shared across requests
+MAX_CACHED_FONTS = 32
+MAX_CACHED_WORDS = 20000
+
+_word_metrics = {}
+
+def font_key(font):
+    path = getattr(font, 'path', None)
+    if path is None:
+        return font
+    return (path, font.size, font.index)
+
+def _metrics_for_font(font):
+    key = font_key(font)
+    metrics = _word_metrics.get(key)
+    if metrics is None:
+        if len(_word_metrics) >= MAX_CACHED_FONTS:
+            del _word_metrics[next(iter(_word_metrics))]
+        metrics = _word_metrics[key] = {}
+    elif len(metrics) > MAX_CACHED_WORDS:
+        metrics.clear()
+    return metrics
+
+def _measure(font, metrics, word):
+    """Return (advance, right edge) of word, measured once per font"""
+    measured = metrics.get(word)
+    if measured is None:
+        right = font.getbbox(word)[2]
+        advance = font.getlength(word) if hasattr(font, 'getlength') else right
+        measured = metrics[word] = (advance, right)
+    return measured
+
+def wrap_text_to_lines(text, font, max_width=240):
+    """
+    Wrap text into lines that fit within max_width, breaking exactly where measuring
+    each growing candidate line with font.getbbox() would.
+
+    Line widths are summed from cached per-word advances. Kerning across the joins and
+    rounding make that sum approximate, so a candidate close to max_width is re-measured
+    as a whole to decide the break.
+    """
+    metrics = _metrics_for_font(font)
+    space_advance = _measure(font, metrics, ' ')[0]
+    tolerance = 2 + 0.1 * getattr(font, 'size', 10)
+
+    lines = []
+    for paragraph in text.split('\n'):
+        if not paragraph.strip():
+            lines.append('')
+            continue
+
+        line_words = []
+        line_advance = 0.0
+        for word in paragraph.split():
+            advance, right = _measure(font, metrics, word)
+            if not line_words:
+                line_words.append(word)
+                line_advance = advance
+                continue
+
+            estimate = line_advance + space_advance + right
+            if abs(estimate - max_width) <= tolerance:
+                fits = font.getbbox(' '.join(line_words) + ' ' + word)[2] <= max_width
+            else:
+                fits = estimate <= max_width
+
+            if fits:
+                line_words.append(word)
+                line_advance += space_advance + advance
+            else:
+                lines.append(' '.join(line_words))
+                line_words = [word]
+                line_advance = advance
+        if line_words:
+            lines.append(' '.join(line_words))
+
+    return lines
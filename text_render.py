@@ -0,0 +1,80 @@
+"""
+1-bit text page renderer. Each glyph is rasterised once per font into a glyph atlas, and pages
+are built by OR-ing glyph bitmaps into a boolean page array at their advance positions.
+"""
+import numpy as np
+from PIL import Image, ImageDraw
+
+from text_layout import font_key
+
+MAX_CACHED_ATLASES = 16
+
+_atlases = {}
+
+class GlyphAtlas:
+    """1-bit glyph bitmaps for one font, each rasterised on first use"""
+
+    def __init__(self, font):
+        self.font = font
+        self.glyphs = {}
+
+    def glyph(self, char):
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.glyphs[char] = self._rasterise(char)
+        return glyph
+
+    def _rasterise(self, char):
+        x0, y0, x1, y1 = self.font.getbbox(char)
+        advance = self.font.getlength(char)
+        if x1 <= x0 or y1 <= y0:
+            return None, x0, y0, advance
+
+        img = Image.new('L', (x1 - x0, y1 - y0), 0)
+        ImageDraw.Draw(img).text((-x0, -y0), char, font=self.font, fill=255)
+        # same threshold the PIL page path applied after convert('L')
+        return np.asarray(img) >= 128, x0, y0, advance
+
+def get_atlas(font):
+    key = font_key(font)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        if len(_atlases) >= MAX_CACHED_ATLASES:
+            del _atlases[next(iter(_atlases))]
+        atlas = _atlases[key] = GlyphAtlas(font)
+    return atlas
+
+def _blit(page, bits, x, y):
+    height, width = bits.shape
+    top, left = max(0, -y), max(0, -x)
+    bottom = min(height, page.shape[0] - y)
+    right = min(width, page.shape[1] - x)
+    if top < bottom and left < right:
+        page[y + top:y + bottom, x + left:x + right] |= bits[top:bottom, left:right]
+
+def render_page_bits(lines, font, line_height, width=256, height=256, left=4):
+    """Render lines top to bottom into a (height, width) boolean array, True where text is drawn"""
+    atlas = get_atlas(font)
+    page = np.zeros((height, width), dtype=bool)
+
+    y = 0
+    for line in lines:
+        if y + line_height > height:
+            break
+        pen_x = float(left)
+        for char in line:
+            bits, x0, y0, advance = atlas.glyph(char)
+            if bits is not None:
+                _blit(page, bits, round(pen_x) + x0, y + y0)
+            pen_x += advance
+        y += line_height
+
+    return page
+
+def render_page(lines, font, line_height, width=256, height=256, left=4):
+    """
+    Render lines into a packed 1-bit page buffer, MSB first with rows padded to whole bytes
+    (the same layout as a PIL mode '1' image's tobytes()). Text pixels are 1, background 0.
+    """
+    page = render_page_bits(lines, font, line_height, width, height, left)
+    return np.packbits(page, axis=1).tobytes()
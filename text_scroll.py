@@ -0,0 +1,66 @@
+"""
+Smooth scrolling display mode: each wrapped line is uploaded to Frame once as its own sprite
+and the text is then scrolled by sending only the scroll position, which the frame app
+(lua/text_scroll_frame_app.lua) uses to redraw the lines it holds.
+"""
+import asyncio
+import struct
+
+from packed_sprite import TxPackedSprite
+from text_render import render_page
+
+LINE_SPRITE_MSG = 0x20
+SCROLL_POSITION_MSG = 0x41
+
+SCROLL_VIEW_HEIGHT = 400
+SCROLL_TICK = 0.1
+# lines kept on Frame above and below the viewport, so short scrolls need no uploads
+SCROLL_RESIDENT_MARGIN = 2
+
+def pack_line_sprite(index, line, font, line_height, palette_data, width=256):
+    sprite = TxPackedSprite(
+        width=width,
+        height=line_height,
+        num_colors=2,
+        palette_data=palette_data,
+        pixel_data=render_page([line], font, line_height, width=width, height=line_height)
+    )
+    return struct.pack('>HI', index, index * line_height) + sprite.pack()
+
+async def scroll_text(frame, lines, font, line_height, palette_data, scroll_speed, executor,
+                      view_height=SCROLL_VIEW_HEIGHT):
+    """Scroll lines through the viewport, one view_height every scroll_speed seconds, rendering lines on executor"""
+    pixels_per_second = view_height / scroll_speed
+    max_offset = max(0, len(lines) * line_height - view_height)
+
+    line_sprites = {}
+    resident = set()
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    offset = 0
+
+    while True:
+        first_line = max(0, offset // line_height - SCROLL_RESIDENT_MARGIN)
+        last_line = min(len(lines) - 1, (offset + view_height) // line_height + SCROLL_RESIDENT_MARGIN)
+
+        # the frame app drops lines outside first_line..last_line when it gets the new position
+        resident = {index for index in resident if first_line <= index <= last_line}
+        for index in range(first_line, last_line + 1):
+            if index in resident:
+                continue
+            if lines[index].strip():
+                payload = line_sprites.get(index)
+                if payload is None:
+                    payload = line_sprites[index] = await loop.run_in_executor(
+                        executor, pack_line_sprite, index, lines[index], font, line_height, palette_data)
+                await frame.send_message(LINE_SPRITE_MSG, payload)
+            resident.add(index)
+
+        await frame.send_message(SCROLL_POSITION_MSG, struct.pack('>IHH', offset, first_line, last_line))
+
+        if offset >= max_offset:
+            break
+
+        await asyncio.sleep(SCROLL_TICK)
+        offset = min(max_offset, int((loop.time() - start) * pixels_per_second))